@@ -0,0 +1,75 @@
+"""Replay a JSONL file of questions through FinanceChatbot.
+
+Each input line is a JSON object {"message": ..., "profile": {...}}. Every
+record is written back out with a "response" field added, in input order.
+
+    python batch.py questions.jsonl -o answers.jsonl --workers 4 --seed 42
+"""
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from finbot.service import chunked, init_worker, respond_chunk
+
+
+def read_records(lines):
+    """Parse JSONL lines, skipping blanks"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def respond_all(records, workers=1, seed=None, chunk_size=64):
+    """Yield (record, response) pairs in input order
+
+    Chunks are fanned out over a process pool, but at most two chunks per
+    worker are in flight at once, so memory stays bounded however long the
+    input stream is.
+    """
+    chunks = chunked(records, chunk_size)
+
+    if workers <= 1:
+        init_worker(seed)
+        for chunk in chunks:
+            yield from zip(chunk, respond_chunk(chunk))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(seed,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(respond_chunk, chunk)))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a JSONL stream of finance questions")
+    parser.add_argument("input", help="JSONL file of {message, profile} records, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible tip selection")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Records per worker task")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for record, response in respond_all(read_records(source), args.workers, args.seed, args.chunk_size):
+            record["response"] = response
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Throughput of the vectorized debt payoff engine.
+
+Each run simulates every (strategy, extra payment) pair for a random set of
+debts in one what_if() call.
+
+    python benchmarks/bench_debt.py
+"""
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.debt import what_if
+
+
+def random_debts(count, rng):
+    debts = []
+    for index in range(count):
+        balance = rng.uniform(500, 30000)
+        apr = rng.uniform(3, 29)
+        debts.append({
+            "name": f"Debt {index + 1}",
+            "balance": balance,
+            "apr": apr,
+            "minimum": max(25.0, balance * (apr / 1200 + 0.01))
+        })
+    return debts
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'debts':>6} {'scenarios':>10} {'ms/call':>8} {'us/scenario':>12}")
+    for debts in (3, 10):
+        for extras in (100, 1000, 5000):
+            portfolio = random_debts(debts, rng)
+            payments = np.linspace(0, 2000, extras)
+            elapsed = min(timeit.repeat(lambda: what_if(portfolio, payments), number=3, repeat=3)) / 3
+            scenarios = 2 * extras
+            print(f"{debts:>6} {scenarios:>10} {elapsed * 1e3:>8.1f} {elapsed / scenarios * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
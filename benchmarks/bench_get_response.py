@@ -0,0 +1,134 @@
+"""Per-stage latency of FinanceChatbot.get_response on synthetic traffic.
+
+Times intent classification, the quick-response scan, each advice method,
+personalization and the end-to-end rule-based answer (cold and warm cache)
+over generated messages and a mix of sparse and detailed profiles, then
+reports the overhead of stage instrumentation when disabled and enabled.
+
+    python benchmarks/bench_get_response.py [--messages 2000] [--export metrics.prom]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.chatbot import FinanceChatbot
+from finbot.metrics import METRICS
+
+
+FILLER = ["how", "should", "i", "my", "about", "can", "you", "help", "with", "the", "what", "is", "a", "good",
+          "way", "to", "start", "think", "month", "plan", "money", "really", "need", "some", "advice"]
+TYPES = ["student", "working professional", "recent graduate", "entrepreneur", "retiree"]
+
+
+def build_messages(store, count, rng):
+    """Keyword-bearing, quick-response and off-topic messages in a 6:1:3 mix"""
+    keywords = [keyword for group in store.intent_keywords.values() for keyword in group]
+    quick = list(store.quick_responses)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(4, 14))]
+        roll = rng.random()
+        if roll < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        elif roll < 0.7:
+            words.insert(rng.randrange(len(words)), rng.choice(quick))
+        messages.append(" ".join(words))
+    return messages
+
+
+def build_profiles(count, rng):
+    """Half bare sidebar profiles, half with income, debts, retirement inputs and spending"""
+    profiles = []
+    for index in range(count):
+        profile = {"type": rng.choice(TYPES), "age": rng.randint(18, 70), "income": 0, "goals": []}
+        if index % 2:
+            income = rng.choice([2500, 4000, 6500, 9000])
+            profile.update({
+                "income": income,
+                "goals": rng.sample(["Pay Off Debt", "Save for House", "Retirement Planning"], 2),
+                "filing_status": rng.choice(["single", "married_joint"]),
+                "debts": [
+                    {"name": "Card", "balance": 4000.0, "apr": 24.0, "minimum": 100.0},
+                    {"name": "Car", "balance": 12000.0, "apr": 6.5, "minimum": 300.0}
+                ],
+                "extra_payment": rng.choice([0, 100, 250]),
+                "retirement_savings": 20000,
+                "contribution_rate": 10,
+                "stock_allocation": 80,
+                "retirement_age": 65,
+                "spending": {"needs": income // 2, "wants": income // 4, "savings": income // 10,
+                             "uncategorized": 0, "income": income, "transactions": 120}
+            })
+        profiles.append(profile)
+    return profiles
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda percent: ordered[min(int(percent / 100 * len(ordered)), len(ordered) - 1)] * 1e6
+    return pick(50), pick(95), pick(99)
+
+
+def report(name, call, inputs):
+    samples = []
+    for arguments in inputs:
+        started = time.perf_counter()
+        call(*arguments)
+        samples.append(time.perf_counter() - started)
+    p50, p95, p99 = percentiles(samples)
+    print(f"{name:<28} {len(samples):>7} {p50:>10.1f} {p95:>10.1f} {p99:>10.1f}")
+    return sum(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--export", help="write the instrumented run's histograms to this Prometheus file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cold = FinanceChatbot(seed=args.seed, cache=False)
+    messages = build_messages(cold.store, args.messages, rng)
+    profiles = build_profiles(args.messages, rng)
+    lowered = [message.lower() for message in messages]
+    pairs = list(zip(messages, profiles))
+    advice = cold.get_advice("general", "", {})
+
+    METRICS.enabled = False
+    print(f"{'stage':<28} {'calls':>7} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    report("classify_intent", cold.classify_intent, [(message,) for message in lowered])
+    report("quick scan", lambda message: cold.matcher.match(message).best("quick"),
+           [(message,) for message in lowered])
+    for intent in ("savings", "budgeting", "investing", "debt", "retirement", "taxes", "general"):
+        report(f"get_advice[{intent}]", lambda message, profile: cold.get_advice(intent, message, profile),
+               pairs[:max(len(pairs) // 10, 20)])
+    report("personalize_response", cold.personalize_response, [(advice, profile) for profile in profiles])
+    report("get_response (no cache)", cold.get_response, pairs)
+
+    warm = FinanceChatbot(seed=args.seed)
+    warm.get_responses(messages, profiles)
+    report("get_response (warm cache)", warm.get_response, pairs)
+
+    disabled = report("instrumentation off", cold.get_response, pairs)
+    METRICS.reset()
+    METRICS.enabled = True
+    enabled = report("instrumentation on", cold.get_response, pairs)
+    METRICS.enabled = False
+    print(f"\ninstrumentation overhead: {(enabled - disabled) / len(pairs) * 1e6:+.1f} us/call "
+          f"({enabled / disabled - 1:+.1%})\n")
+
+    print(f"{'recorded stage':<28} {'calls':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for row in METRICS.summary():
+        print(f"{row['stage']:<28} {row['count']:>7} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} "
+              f"{row['p99_ms']:>10.3f}")
+    if args.export:
+        print(f"\nwrote {METRICS.export(args.export)}")
+
+
+if __name__ == "__main__":
+    main()
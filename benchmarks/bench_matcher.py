@@ -0,0 +1,73 @@
+"""Per-message latency of the keyword matcher against the old substring scan.
+
+Run from the repository root:
+
+    python benchmarks/bench_matcher.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.matcher import KeywordMatcher
+
+
+INTENTS = ["savings", "budgeting", "investing", "debt", "retirement", "credit", "taxes"]
+SIZES = [50, 500, 2000, 5000]
+MESSAGES = 200
+
+
+def random_word(rng):
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10)))
+
+
+def build_keywords(size, rng):
+    keywords = {intent: [] for intent in INTENTS}
+    for index in range(size):
+        phrase = " ".join(random_word(rng) for _ in range(rng.randint(1, 2)))
+        keywords[INTENTS[index % len(INTENTS)]].append(phrase)
+    return keywords
+
+
+def build_messages(keywords, rng):
+    vocabulary = [keyword for group in keywords.values() for keyword in group]
+    messages = []
+    for _ in range(MESSAGES):
+        words = [random_word(rng) for _ in range(rng.randint(6, 20))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(vocabulary))
+        messages.append(" ".join(words))
+    return messages
+
+
+def legacy_classify(keywords, message):
+    for intent, group in keywords.items():
+        if any(keyword in message for keyword in group):
+            return intent
+    return "general"
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'keywords':>9} {'legacy us/msg':>14} {'matcher us/msg':>15} {'speedup':>8}")
+    for size in SIZES:
+        keywords = build_keywords(size, rng)
+        messages = build_messages(keywords, rng)
+        matcher = KeywordMatcher({"intent": keywords})
+
+        legacy = min(timeit.repeat(
+            lambda: [legacy_classify(keywords, message) for message in messages],
+            number=5, repeat=3
+        )) / (5 * MESSAGES)
+        compiled = min(timeit.repeat(
+            lambda: [matcher.match(message).best("intent", "general") for message in messages],
+            number=5, repeat=3
+        )) / (5 * MESSAGES)
+
+        print(f"{size:>9} {legacy * 1e6:>14.1f} {compiled * 1e6:>15.1f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Wall time of the Monte Carlo retirement projection by path count and workers.
+
+    python benchmarks/bench_retirement.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.retirement import project_retirement
+
+
+def main():
+    workers = [1] + ([os.cpu_count()] if (os.cpu_count() or 1) > 1 else [])
+    print(f"{'paths':>8} {'months':>7} {'workers':>8} {'seconds':>8} {'success':>8}")
+    for paths in (10000, 50000, 100000):
+        for count in workers:
+            started = time.perf_counter()
+            # A distinct seed per run keeps the projection cache out of the timing.
+            projection = project_retirement(25, 5000, paths=paths, workers=count, seed=paths + count)
+            elapsed = time.perf_counter() - started
+            print(f"{paths:>8} {len(projection.ages) * 12 - 12:>7} {count:>8} {elapsed:>8.2f} "
+                  f"{projection.success_probability:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Build time and per-query latency of the BM25 index across corpus sizes.
+
+Synthetic tips are drawn from the real knowledge base vocabulary so term
+statistics stay realistic as the corpus grows.
+
+    python benchmarks/bench_retrieval.py
+"""
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.knowledge import shared_store
+from finbot.retrieval import BM25Index, tokenize
+
+
+SIZES = [100, 1000, 10000, 50000]
+QUERIES = [
+    "how do I check my credit report",
+    "are tax deductions worth it",
+    "what about healthcare costs in retirement",
+    "best way to pay off student loans faster",
+    "should I use index funds or ETFs",
+]
+
+
+def synthetic_corpus(size, rng):
+    vocabulary = sorted({token for document in shared_store().index.documents for token in tokenize(document)})
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 20))) for _ in range(size)]
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'documents':>10} {'build ms':>9} {'query us':>9} {'top-5 us':>9}")
+    for size in SIZES:
+        corpus = synthetic_corpus(size, rng)
+        started = time.perf_counter()
+        index = BM25Index(corpus)
+        build = time.perf_counter() - started
+
+        query = min(timeit.repeat(lambda: [index.scores(q) for q in QUERIES], number=20, repeat=3))
+        top = min(timeit.repeat(lambda: [index.search(q, k=5) for q in QUERIES], number=20, repeat=3))
+        calls = 20 * len(QUERIES)
+        print(f"{size:>10} {build * 1e3:>9.1f} {query / calls * 1e6:>9.1f} {top / calls * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
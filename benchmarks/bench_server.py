@@ -0,0 +1,163 @@
+"""Throughput and tail latency of server.py at increasing concurrency.
+
+Each virtual client holds one keep-alive connection and sends requests back
+to back for --duration seconds per concurrency level. 429s are counted
+separately from errors, so the point where backpressure starts is visible.
+With --spawn, a server is started on a free port for the run and stopped
+with SIGTERM afterwards.
+
+    python benchmarks/bench_server.py --spawn --workers 2
+    python benchmarks/bench_server.py --port 8000 --endpoint respond_batch --batch-size 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESSAGES = [
+    "how much should I keep in an emergency fund", "what is a good way to budget my paycheck",
+    "should I pay off my credit card or invest", "how do index funds work", "when should I start saving for retirement",
+    "how much tax will I pay on a raise", "any tips for saving money each month", "what is a roth ira",
+    "how do I improve my credit score", "hello"
+]
+PROFILES = [
+    {"type": "student", "age": 20},
+    {"type": "working professional", "age": 34, "income": 6000, "goals": ["Save for House"]},
+    {"type": "recent graduate", "age": 23, "income": 3500,
+     "debts": [{"name": "Loan", "balance": 18000, "apr": 5.5, "minimum": 200}], "extra_payment": 100}
+]
+
+
+async def request(reader, writer, host, path, body):
+    """Send one POST on an open connection; returns the status code"""
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, path, bodies, deadline, latencies, counts):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await request(reader, writer, host, path, random.choice(bodies))
+            except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+                counts["errors"] += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            elif status == 429:
+                counts["rejected"] += 1
+                await asyncio.sleep(0.01)
+            else:
+                counts["errors"] += 1
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, path, bodies, concurrency, duration):
+    latencies = []
+    counts = {"rejected": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, path, bodies, deadline, latencies, counts) for _ in range(concurrency)
+    ))
+    return latencies, counts, time.perf_counter() - started
+
+
+def build_bodies(endpoint, batch_size, rng):
+    bodies = []
+    for _ in range(64):
+        records = [{"message": rng.choice(MESSAGES), "profile": rng.choice(PROFILES)} for _ in range(batch_size)]
+        document = records[0] if endpoint == "respond" else {"requests": records}
+        bodies.append(json.dumps(document).encode("utf-8"))
+    return bodies
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_listening(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--spawn", action="store_true", help="start server.py on a free port for the run")
+    parser.add_argument("--workers", type=int, default=1, help="server workers when spawning")
+    parser.add_argument("--max-pending", type=int, default=256, help="server queue limit when spawning")
+    parser.add_argument("--endpoint", choices=("respond", "respond_batch"), default="respond")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--concurrency", default="1,4,16,64,256")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        args.port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(args.port),
+             "--workers", str(args.workers), "--max-pending", str(args.max_pending)],
+            cwd=ROOT
+        )
+        wait_until_listening(args.host, args.port)
+
+    batch_size = args.batch_size if args.endpoint == "respond_batch" else 1
+    bodies = build_bodies(args.endpoint, batch_size, random.Random(0))
+    print(f"{'clients':>8} {'req/s':>9} {'msg/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'429s':>7} {'errors':>7}")
+    try:
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            latencies, counts, elapsed = asyncio.run(
+                run_level(args.host, args.port, f"/{args.endpoint}", bodies, concurrency, args.duration)
+            )
+            latencies.sort()
+            pick = lambda percent: latencies[min(int(percent / 100 * len(latencies)), len(latencies) - 1)] * 1e3 \
+                if latencies else float("nan")
+            print(f"{concurrency:>8} {len(latencies) / elapsed:>9.1f} {len(latencies) * batch_size / elapsed:>9.1f} "
+                  f"{pick(50):>8.1f} {pick(95):>8.1f} {pick(99):>8.1f} {counts['rejected']:>7} {counts['errors']:>7}")
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Per-session memory of FinanceChatbot with and without the shared knowledge store.
+
+"Before" rebuilds the advice tables and keyword matcher for every session,
+as FinanceChatbot.__init__ used to. "After" is the current thin handle over
+the process-wide store. The conversation state a session carries is then
+measured after increasingly long chats, to show it stays the same size.
+
+    python benchmarks/bench_session_memory.py
+"""
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finbot.knowledge import KNOWLEDGE_PATH, KnowledgeFile, shared_store
+from finbot.chatbot import FinanceChatbot
+from finbot.conversation import ConversationState, extract_entities
+from finbot.matcher import KeywordMatcher
+
+
+SESSIONS = 1000
+TURNS = [10, 1000, 100000]
+CHAT = [
+    "how do I pay off my credit card", "what about $500 a month?", "and if I'm 30 and retire at 60",
+    "invest $300 a month for 20 years at 8%", "hello", "how about 12 months instead"
+]
+
+_source = KnowledgeFile(KNOWLEDGE_PATH)
+KNOWLEDGE_BASE = {topic: _source.read_topic(topic) for topic in _source.spans}
+QUICK_RESPONSES = _source.header["quick_responses"]
+GENERAL_TIPS = _source.header["general_tips"]
+INTENT_KEYWORDS = _source.header["intent_keywords"]
+
+
+class PerSessionChatbot:
+    """Session object that owns its own copy of every table"""
+
+    def __init__(self):
+        self.api_key = os.getenv("HF_API_KEY")
+        self.rng = random.Random()
+        self.knowledge_base = copy.deepcopy(KNOWLEDGE_BASE)
+        self.quick_responses = copy.deepcopy(QUICK_RESPONSES)
+        self.general_tips = list(GENERAL_TIPS)
+        self.matcher = KeywordMatcher({
+            "intent": INTENT_KEYWORDS,
+            "quick": {keyword: [keyword] for keyword in self.quick_responses}
+        })
+
+
+def measure(factory):
+    tracemalloc.start()
+    started = time.perf_counter()
+    sessions = [factory() for _ in range(SESSIONS)]
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    return size, elapsed
+
+
+def main():
+    shared_store()
+    print(f"{'':>8} {'total KiB':>10} {'per session B':>14} {'construct us':>13}")
+    for name, factory in [("before", PerSessionChatbot), ("after", FinanceChatbot)]:
+        size, elapsed = measure(factory)
+        print(f"{name:>8} {size / 1024:>10.1f} {size / SESSIONS:>14.0f} {elapsed / SESSIONS * 1e6:>13.1f}")
+
+    bot = FinanceChatbot(cache=False)
+    intents = [bot.matcher.match(message).best("intent") for message in CHAT]
+    print(f"\n{'turns':>8} {'state B':>10} {'update us/turn':>15}")
+    for turns in TURNS:
+        tracemalloc.start()
+        state = ConversationState()
+        started = time.perf_counter()
+        for turn in range(turns):
+            message = CHAT[turn % len(CHAT)]
+            entities = extract_entities(message)
+            state.update(state.resolve(intents[turn % len(CHAT)], message, entities), entities)
+        elapsed = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{turns:>8} {size:>10} {elapsed / turns * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Rule-based personal finance advice engine"""
+from .chatbot import FinanceChatbot
+from .conversation import ConversationState
+
+__all__ = ["FinanceChatbot", "ConversationState"]
@@ -0,0 +1,143 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+
+
+AGE_BANDS = [30, 40, 50]
+INCOME_BANDS = [1, 3000, 6000]
+
+
+def normalize_message(message):
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return " ".join(message.lower().split()).strip(" ?!.")
+
+
+def profile_bucket(profile, intent=None):
+    """Reduce a profile to the fields and bands that change the advice
+
+    Debt and retirement answers are computed from the user's exact numbers,
+    so those fields are only part of the bucket for their own intent, as are
+    the conversation values that savings and investing answers project.
+    """
+    bucket = (
+        profile.get("type", "general"),
+        bisect.bisect_right(AGE_BANDS, profile.get("age", 25)),
+        bisect.bisect_right(INCOME_BANDS, profile.get("income", 0)),
+        tuple(sorted(profile.get("goals", [])))
+    )
+    if intent == "debt":
+        bucket += (
+            tuple(
+                (debt.get("name"), debt.get("balance"), debt.get("apr"), debt.get("minimum"))
+                for debt in profile.get("debts") or []
+            ),
+            profile.get("extra_payment", 0)
+        )
+    elif intent == "taxes":
+        bucket += (profile.get("income", 0), profile.get("filing_status", "single"))
+    elif intent in ("savings", "budgeting"):
+        spending = profile.get("spending")
+        if spending:
+            # Statement comparisons quote percentages of the exact income.
+            bucket += (tuple(sorted(spending.items())), profile.get("income", 0))
+    elif intent == "retirement":
+        bucket += tuple(
+            profile.get(field) for field in
+            ("age", "income", "retirement_savings", "contribution_rate", "stock_allocation", "retirement_age")
+        )
+    if intent in ("savings", "investing"):
+        bucket += (tuple(sorted((profile.get("context") or {}).items())),)
+    return bucket
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of generated advice with optional TTL.
+
+    Entries are tagged with the knowledge store version they were built
+    from; binding the cache to a new version drops everything.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def bind(self, version):
+        """Clear the cache if the knowledge store version has changed"""
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Return counters and the current hit rate"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """Return the process-wide ResponseCache, creating it on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache()
+    return _shared_cache
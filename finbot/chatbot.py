@@ -0,0 +1,425 @@
+import os
+import random
+
+from .cache import normalize_message, profile_bucket, shared_cache
+from .conversation import ConversationState, describe_duration, extract_entities, future_value
+from .knowledge import shared_store
+from .metrics import timed, timed_method
+
+# debt, retirement and taxes load numpy and llm loads asyncio, so they are
+# imported by the methods that need them; importing the engine stays cheap.
+
+
+class FinanceChatbot:
+    def __init__(self, seed=None, cache=None, generator=None):
+        self.api_key = os.getenv("HF_API_KEY")
+        self.generator = generator
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.cache = shared_cache() if cache is None else cache
+
+        self.store = None
+        self.last_intent = None
+        self.last_profile = None
+        self.refresh_knowledge()
+
+    def refresh_knowledge(self):
+        """Point this session at the current process-wide knowledge store
+
+        The advice tables are shared and read-only; each session only holds
+        references to them. Called at the start of every request, so a
+        reloaded knowledge base is picked up on the next message while the
+        current one finishes against the store it started with.
+        """
+        store = shared_store()
+        if store is self.store:
+            return
+        self.store = store
+        self.knowledge_version = store.version
+        self.knowledge_base = store.knowledge_base
+        self.quick_responses = store.quick_responses
+        self.general_tips = store.general_tips
+        self.matcher = store.matcher
+
+    @property
+    def index(self):
+        return self.store.index
+    
+    def get_response(self, user_message, user_profile, conversation=None):
+        """Generate personalized financial advice"""
+        if self.generator is None:
+            return self.get_rule_response(user_message, user_profile, conversation)
+        return "".join(self.stream_response(user_message, user_profile, conversation))
+
+    def stream_response(self, user_message, user_profile, conversation=None):
+        """Yield the response in chunks as the generation backend produces it
+
+        The rule-based answer is both the reference given to the model and
+        the fallback when the backend is missing, slow or failing.
+        """
+        with timed("stream_response"):
+            advice = self.get_rule_response(user_message, user_profile, conversation)
+            if self.generator is None:
+                yield advice
+                return
+            from .llm import build_messages
+
+            yield from self.generator.stream(build_messages(user_message, user_profile, advice), advice)
+
+    @timed_method()
+    def get_rule_response(self, user_message, user_profile, conversation=None):
+        """Generate personalized financial advice from the knowledge base
+
+        Pass the session's ConversationState to let this message build on
+        earlier turns; without one the message stands alone.
+        """
+        self.refresh_knowledge()
+        if conversation is None:
+            conversation = ConversationState()
+        
+        # Clean and analyze the user message
+        message_lower = user_message.lower()
+        
+        with timed("match"):
+            matches = self.matcher.match(message_lower)
+        with timed("extract"):
+            entities = extract_entities(message_lower)
+
+        keyword = matches.best("quick")
+        if keyword:
+            conversation.update("quick", entities)
+            self.last_intent = "quick"
+            self.last_profile = user_profile
+            return self.personalize_response(self.quick_responses[keyword], user_profile)
+        
+        intent = conversation.resolve(matches.best("intent"), message_lower, entities)
+        conversation.update(intent, entities)
+        user_profile = conversation.apply(user_profile, intent)
+        self.last_intent = intent
+        self.last_profile = user_profile
+
+        # Tip selection is seeded from the cache key (less the knowledge
+        # version, which is file-specific), so a cached answer is exactly
+        # what recomputing it would have produced.
+        selection = (self.seed, normalize_message(message_lower), intent, profile_bucket(user_profile, intent))
+        key = (self.knowledge_version,) + selection
+        advice = None
+        if self.cache:
+            with timed("cache_lookup"):
+                self.cache.bind(self.knowledge_version)
+                advice = self.cache.get(key)
+        if advice is None:
+            self.rng.seed(repr(selection))
+            advice = self.get_advice(intent, user_message, user_profile)
+            if self.cache:
+                self.cache.put(key, advice)
+        
+        return self.personalize_response(advice, user_profile)
+
+    @timed_method()
+    def get_advice(self, intent, user_message, user_profile):
+        """Route a classified message to the matching advice method"""
+        user_type = user_profile.get("type", "general")
+        user_age = user_profile.get("age", 25)
+
+        if intent == "savings":
+            return self.get_savings_advice(user_type, user_profile)
+        elif intent == "budgeting":
+            return self.get_budgeting_advice(user_type, user_profile)
+        elif intent == "investing":
+            return self.get_investing_advice(user_type, user_age, user_profile)
+        elif intent == "debt":
+            return self.get_debt_advice(user_type, user_profile)
+        elif intent == "retirement":
+            return self.get_retirement_advice(user_age, user_profile)
+        elif intent == "taxes":
+            return self.get_tax_advice(user_profile)
+        else:
+            return self.get_general_advice(user_message, user_profile)
+    
+    def get_responses(self, messages, profiles):
+        """Generate advice for a batch of messages, in input order"""
+        return [self.get_response(message, profile) for message, profile in zip(messages, profiles)]
+
+    @timed_method()
+    def classify_intent(self, message):
+        """Classify user intent based on keywords"""
+        return self.matcher.match(message).best("intent", "general")
+    
+    @timed_method()
+    def get_savings_advice(self, user_type, user_profile):
+        """Get personalized savings advice"""
+        if user_type in self.knowledge_base["savings"]:
+            base_advice = self.rng.choice(self.knowledge_base["savings"][user_type])
+        else:
+            base_advice = self.rng.choice(self.knowledge_base["savings"]["student"])
+
+        spending = user_profile.get("spending")
+        income = user_profile.get("income", 0) or (spending or {}).get("income", 0)
+        if income > 0:
+            if income < 3000:
+                base_advice += "\n\n💡 With an income under $3,000/month, start by saving just $50-100 monthly. Small amounts build great habits!"
+            elif income < 6000:
+                base_advice += "\n\n💡 With $3,000-6,000/month income, try to save $300-600 monthly (10-20% of income)."
+            else:
+                base_advice += "\n\n💡 With $6,000+/month income, aim for saving $1,000+ monthly if possible."
+
+        if spending and income > 0:
+            rate = spending["savings"] / income
+            base_advice += f"\n\n📊 Your statement shows about ${spending['savings']:,}/month going to savings and investments ({rate:.0%} of income)."
+            if rate < 0.2:
+                base_advice += f" Reaching 20% means finding another ${income * 0.2 - spending['savings']:,.0f}/month - your ${spending['wants']:,}/month of wants is the first place to look."
+
+        context = user_profile.get("context") or {}
+        if "amount" in context:
+            base_advice += self.describe_savings_plan(context)
+        
+        return base_advice
+
+    def describe_savings_plan(self, context):
+        """Project the amount, duration and interest rate the user mentioned"""
+        amount, months, rate = context["amount"], context.get("months"), context.get("rate", 0)
+        interest = f" at {rate:g}% interest" if rate else ""
+        if "period" not in context:
+            if not months:
+                return ""
+            monthly = amount / future_value(1, rate, months)
+            return (f"\n\n🎯 To reach ${amount:,.0f} in {describe_duration(months)}{interest}, "
+                    f"set aside about ${monthly:,.0f}/month.")
+
+        monthly = amount / 12 if context["period"] == "year" else amount
+        if months:
+            return (f"\n\n🎯 Setting aside ${monthly:,.0f}/month for {describe_duration(months)}{interest} "
+                    f"builds about ${future_value(monthly, rate, months):,.0f}.")
+        return (f"\n\n🎯 Setting aside ${monthly:,.0f}/month{interest} adds up to about "
+                f"${future_value(monthly, rate, 12):,.0f} in a year and ${future_value(monthly, rate, 60):,.0f} in 5 years.")
+    
+    @timed_method()
+    def get_budgeting_advice(self, user_type, user_profile):
+        """Get personalized budgeting advice"""
+        if user_type in self.knowledge_base["budgeting"]:
+            advice = self.rng.choice(self.knowledge_base["budgeting"][user_type])
+        else:
+            advice = self.rng.choice(self.knowledge_base["budgeting"]["student"])
+
+        goals = user_profile.get("goals", [])
+        if "Budget Better" in goals:
+            advice += "\n\n🎯 Since budgeting is one of your goals, try the 50/30/20 rule as a starting point, then adjust based on your specific needs."
+
+        if user_profile.get("spending"):
+            advice += self.describe_spending(user_profile["spending"], user_profile.get("income", 0))
+        
+        return advice
+
+    def describe_spending(self, spending, stated_income=0):
+        """Compare an imported statement's breakdown with the 50/30/20 rule"""
+        income = stated_income or spending["income"]
+        outflow = spending["needs"] + spending["wants"] + spending["savings"] + spending["uncategorized"]
+        base = income or outflow
+        if not base:
+            return ""
+
+        lines = [f"\n\n📊 **From your statement** ({spending['transactions']:,} transactions, per month):\n"]
+        for category, target in (("needs", 0.5), ("wants", 0.3), ("savings", 0.2)):
+            lines.append(f"- {category.title()}: ${spending[category]:,} ({spending[category] / base:.0%} vs {target:.0%} target)")
+        if spending["uncategorized"] / base > 0.15:
+            lines.append(f"- Uncategorized: ${spending['uncategorized']:,} - worth a look to see where it goes")
+
+        excess = spending["wants"] - 0.3 * base
+        if excess > 0:
+            lines.append(f"\nWants run ${excess:,.0f}/month over the 30% guideline - trimming there is the quickest win.")
+        elif spending["savings"] < 0.2 * base:
+            lines.append(f"\nYour wants are in check; try moving ${0.2 * base - spending['savings']:,.0f}/month more into savings.")
+        else:
+            lines.append("\nYou're on track with the 50/30/20 rule - nice work!")
+        return "\n".join(lines)
+    
+    @timed_method()
+    def get_investing_advice(self, user_type, age, user_profile=None):
+        """Get age and type appropriate investing advice"""
+        if user_type in self.knowledge_base["investing"]:
+            advice = self.rng.choice(self.knowledge_base["investing"][user_type])
+        else:
+            advice = self.rng.choice(self.knowledge_base["investing"]["student"])
+
+        if age < 30:
+            advice += "\n\n📈 At your age, you can afford to take more risk for potentially higher returns. Consider 80-90% stocks, 10-20% bonds."
+        elif age < 50:
+            advice += "\n\n⚖️ Consider a balanced approach - maybe 70-80% stocks, 20-30% bonds as you're building wealth."
+        else:
+            advice += "\n\n🛡️ As you're closer to retirement, consider gradually shifting to more conservative investments."
+
+        context = (user_profile or {}).get("context") or {}
+        if "amount" in context:
+            advice += self.describe_investment_growth(context)
+        
+        return advice
+
+    def describe_investment_growth(self, context):
+        """Grow the amount the user mentioned at their rate, or 7% a year, over their horizon or 10 years"""
+        amount, rate, months = context["amount"], context.get("rate", 7), context.get("months") or 120
+        horizon = describe_duration(months)
+        if "period" not in context:
+            grown = amount * (1 + rate / 100 / 12) ** months
+            return (f"\n\n💵 A one-time ${amount:,.0f} invested for {horizon} at a {rate:g}% average annual "
+                    f"return could grow to about ${grown:,.0f}.")
+        monthly = amount / 12 if context["period"] == "year" else amount
+        return (
+            f"\n\n💵 Investing ${monthly:,.0f}/month for {horizon} at a {rate:g}% average annual return could "
+            f"grow to about ${future_value(monthly, rate, months):,.0f} - ${monthly * months:,.0f} of that is "
+            f"your own contributions. Returns aren't guaranteed; markets can fall for years at a time."
+        )
+    
+    @timed_method()
+    def get_debt_advice(self, user_type, user_profile=None):
+        """Get debt management advice"""
+        base_advice = self.rng.choice(self.knowledge_base["debt"]["general"])
+        
+        if user_type == "student" or user_type == "recent graduate":
+            base_advice += "\n\n" + self.rng.choice(self.knowledge_base["debt"]["student"])
+
+        if user_profile and user_profile.get("debts"):
+            base_advice += self.describe_debt_plan(user_profile["debts"], user_profile.get("extra_payment", 0))
+        
+        return base_advice
+
+    def describe_debt_plan(self, debts, extra_payment):
+        """Compare avalanche and snowball payoff for the user's own debts"""
+        from .debt import PayoffComparison, format_months, what_if
+
+        plan = PayoffComparison(debts, extra_payment)
+        if not plan:
+            return ""
+        avalanche, snowball = plan.summary()
+
+        lines = [
+            f"\n\n📉 **Your payoff plan** at ${plan.budget:,.0f}/month:\n",
+            "| Strategy | Debt-free in | Total interest |",
+            "|---|---|---|"
+        ]
+        for row in (avalanche, snowball):
+            interest = f"${row['total_interest']:,.0f}" if row["paid_off"] else "—"
+            lines.append(f"| {row['strategy'].title()} | {format_months(row['months'])} | {interest} |")
+
+        if not avalanche["paid_off"]:
+            lines.append("\n⚠️ At this budget your balances keep growing - the minimum payments don't cover the interest. Any extra you can add will help.")
+            return "\n".join(lines)
+
+        saving = snowball["total_interest"] - avalanche["total_interest"]
+        first_win = plan.result.payoff_month.min(axis=1)
+        if saving >= 1:
+            lines.append(
+                f"\nAvalanche saves you about ${saving:,.0f} in interest. Snowball clears your first debt "
+                f"in month {first_win[1]} instead of month {first_win[0]}, if quick wins keep you motivated."
+            )
+        else:
+            lines.append("\nBoth methods cost about the same here, so pick whichever keeps you motivated.")
+
+        months, _ = what_if(debts, [extra_payment, extra_payment + 100], ("avalanche",))
+        sooner = int(months[0, 0] - months[0, 1])
+        if sooner > 0:
+            lines.append(f"\n💡 Adding another $100/month would make you debt-free {describe_duration(sooner)} sooner.")
+        return "\n".join(lines)
+    
+    @timed_method()
+    def get_retirement_advice(self, age, user_profile=None):
+        """Get age-appropriate retirement advice"""
+        if age < 30:
+            advice = self.rng.choice(self.knowledge_base["retirement"]["20s"])
+        elif age < 40:
+            advice = self.rng.choice(self.knowledge_base["retirement"]["30s"])
+        else:
+            advice = self.rng.choice(self.knowledge_base["retirement"]["40s"])
+
+        if user_profile:
+            advice += self.describe_retirement_projection(user_profile)
+
+        return advice
+
+    def describe_retirement_projection(self, user_profile):
+        """Summarize a Monte Carlo projection of the user's retirement savings"""
+        from .retirement import project_retirement, projection_inputs
+
+        inputs = projection_inputs(user_profile)
+        if inputs is None:
+            return ""
+        projection = project_retirement(**inputs)
+
+        age = inputs["age"]
+        milestone = inputs["retirement_age"] if age < inputs["retirement_age"] else min(age + 10, 95)
+        band = projection.band_at(milestone)
+        return (
+            f"\n\n🔮 **Retirement projection** ({projection.paths:,} simulated markets): saving "
+            f"{inputs['contribution_rate']:.0%} of your income (${projection.contribution:,.0f}/month) with "
+            f"{inputs['stock_allocation']:.0%} in stocks, there's a **{projection.success_probability:.0%}** "
+            f"chance your savings last to age 95, if you spend 70% of today's income in retirement."
+            f"\n\nAt {milestone}, the median outcome is ${band[50]:,.0f} (10th-90th percentile: "
+            f"${band[10]:,.0f} - ${band[90]:,.0f}), in today's dollars."
+        )
+
+    @timed_method()
+    def get_tax_advice(self, user_profile):
+        """Get tax tips with a federal estimate for the user's income"""
+        advice = self.rng.choice(self.knowledge_base["taxes"]["general"])
+        income = user_profile.get("income", 0)
+        if income <= 0:
+            return advice + "\n\n🧾 Add your monthly income in the sidebar and I'll estimate your federal income tax."
+        return advice + self.describe_tax_estimate(income * 12, user_profile.get("filing_status", "single"))
+
+    def describe_tax_estimate(self, annual_income, filing_status):
+        """Summarize the federal tax estimate, raise curve and 401(k) savings"""
+        from .taxes import FILING_STATUSES, estimate_tax, raise_curve
+
+        estimate = estimate_tax(annual_income, filing_status)
+        extra_tax, take_home = raise_curve(annual_income, [5000, 10000], filing_status)
+        with_401k = estimate_tax(annual_income, filing_status, pretax_contributions=5000)
+
+        lines = [
+            f"\n\n🧾 **{estimate.year} federal estimate** ({FILING_STATUSES[filing_status]}, ${annual_income:,.0f}/year): "
+            f"after the ${estimate.standard_deduction:,.0f} standard deduction, taxable income is "
+            f"${float(estimate.taxable):,.0f} and the estimated tax is ${float(estimate.tax):,.0f} - an effective "
+            f"rate of {float(estimate.effective_rate):.1%}, with a {float(estimate.marginal_rate):.0%} marginal bracket.\n"
+        ]
+        for amount, tax, kept in zip((5000, 10000), extra_tax, take_home):
+            lines.append(f"- A ${amount:,} raise would add about ${tax:,.0f} in tax (${kept:,.0f} more take-home)")
+        saving = float(estimate.tax - with_401k.tax)
+        if saving > 0:
+            lines.append(f"- Putting $5,000 more into a traditional 401(k) would cut your tax by about ${saving:,.0f}")
+        lines.append("\n*Federal income tax only - state tax, payroll taxes and credits aren't included.*")
+        return "\n".join(lines)
+
+    @timed_method()
+    def get_general_advice(self, message, user_profile):
+        """Best-matching tip from the whole knowledge base, or general financial wisdom"""
+        results = self.index.search(message, k=1)
+        if results:
+            return results[0][0]
+        return self.rng.choice(self.general_tips)
+    
+    @timed_method()
+    def personalize_response(self, base_response, user_profile):
+        """Add personalization based on user profile"""
+        user_type = user_profile.get("type", "")
+        goals = user_profile.get("goals", [])
+
+        if user_type == "student":
+            prefix = "As a student, "
+        elif user_type == "working professional":
+            prefix = "For a working professional like you, "
+        elif user_type == "recent graduate":
+            prefix = "As a recent graduate, "
+        elif user_type == "entrepreneur":
+            prefix = "As an entrepreneur, "
+        elif user_type == "retiree":
+            prefix = "In retirement, "
+        else:
+            prefix = ""
+
+        goal_encouragement = ""
+        if goals:
+            if len(goals) == 1:
+                goal_encouragement = f"\n\n🎯 I see you're focused on '{goals[0]}' - this advice should help with that goal!"
+            else:
+                goal_encouragement = f"\n\n🎯 This aligns well with your goals of {', '.join(goals[:2])}!"
+        
+        return f"{prefix}{base_response}{goal_encouragement}"
@@ -0,0 +1,189 @@
+import re
+from collections import deque
+
+
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)\s*(k\b|thousand\b)?"
+AMOUNT = re.compile(
+    rf"\$\s?{_NUMBER}"
+    rf"|\b{_NUMBER}\s*(?:dollars|bucks|usd)\b"
+    rf"|\b{_NUMBER}(?=\s*(?:/|a|an|per|each|every)\s*(?:month|mo|year|yr)\b)"
+)
+PERIOD = re.compile(
+    r"\s*(?:(?:/|a|an|per|each|every)\s*(month|mo|year|yr|annum)s?\b|(monthly|annually|yearly)\b)"
+)
+RATE = re.compile(r"\b(\d+(?:\.\d+)?)\s?(?:%|percent\b)")
+AGE = re.compile(
+    r"\b(?:i'?m|i am|aged?|at age)\s+(\d{2})\b"
+    # "i'm 30 thousand in debt" and "i'm 10 years from retiring" aren't ages.
+    r"(?![.,]\d|\s*(?:%|percent\b|k\b|thousand\b|grand\b|dollars\b|bucks\b|usd\b|(?:years?|yrs?|months?|mos?)\b(?![\s-]*old)))"
+    r"|\b(\d{2})[\s-]*(?:years?|yrs?)[\s-]*old\b"
+)
+RETIREMENT_AGE = re.compile(r"\bretir\w*\s+(?:at|by)\s+(?:age\s+)?(\d{2})\b")
+DURATION = re.compile(r"\b(\d+(?:\.\d+)?)\s*(years?|yrs?|months?|mos?)\b(?![\s-]*old)")
+FOLLOW_UP = re.compile(r"\b(?:what|how) about\b|\bwhat if\b|\band if\b|\binstead\b|\bthe same\b")
+
+# Values outside these bounds are treated as typos and ignored; they would
+# also overflow the compound-growth math.
+MAX_MONTHS = 100 * 12
+MAX_RATE = 100.0
+MAX_AMOUNT = 100_000_000
+
+# Intents that aren't a topic a follow-up could continue.
+NO_TOPIC = ("general", "quick")
+
+
+def _number(text, suffix):
+    value = float(text.replace(",", ""))
+    return value * 1000 if suffix else value
+
+
+def extract_entities(text):
+    """Amount, period, age, retirement age, rate and duration found in a lowercased message"""
+    entities = {}
+    amount = AMOUNT.search(text)
+    if amount:
+        groups = amount.groups()
+        index = next(i for i in (0, 2, 4) if groups[i] is not None)
+        value = _number(groups[index], groups[index + 1])
+        if value <= MAX_AMOUNT:
+            entities["amount"] = value
+            period = PERIOD.match(text, amount.end())
+            if period:
+                unit = period.group(1) or period.group(2)
+                entities["period"] = "month" if "mo" in unit else "year"
+
+    retirement_age = RETIREMENT_AGE.search(text)
+    if retirement_age:
+        entities["retirement_age"] = int(retirement_age.group(1))
+        # "retire at age 60" is not the user's own age.
+        text = text[:retirement_age.start()] + text[retirement_age.end():]
+    age = AGE.search(text)
+    if age:
+        entities["age"] = int(age.group(1) or age.group(2))
+
+    rate = RATE.search(text)
+    if rate and float(rate.group(1)) <= MAX_RATE:
+        entities["rate"] = float(rate.group(1))
+
+    duration = DURATION.search(text)
+    if duration:
+        count = float(duration.group(1))
+        months = round(count if duration.group(2).startswith("mo") else count * 12)
+        if 1 <= months <= MAX_MONTHS:
+            entities["months"] = months
+    return entities
+
+
+class ConversationState:
+    """What one chat has established so far, updated once per turn
+
+    Holds the last few intents plus the most recent value of each entity.
+    Each turn only reads the new message, so the cost per turn and the
+    size of the state stay constant however long the chat runs.
+    """
+
+    __slots__ = ("intents", "topic", "turns", "amount", "period", "age", "retirement_age", "rate", "months",
+                 "profile_age")
+    VALUES = ("amount", "period", "age", "retirement_age", "rate", "months")
+    # Values that belong to a topic rather than to the person, dropped when
+    # the user moves to a new topic without restating them.
+    TOPIC_VALUES = ("amount", "period", "rate", "months")
+
+    def __init__(self, history=8):
+        self.intents = deque(maxlen=history)
+        self.topic = None
+        self.turns = 0
+        # The profile's own age when the user last stated theirs.
+        self.profile_age = None
+        for name in self.VALUES:
+            setattr(self, name, None)
+
+    def resolve(self, intent, text, entities):
+        """The intent to answer with: a keyword-less follow-up continues the current topic"""
+        if intent is None:
+            if self.topic is not None and (entities or FOLLOW_UP.search(text)):
+                return self.topic
+            return "general"
+        return intent
+
+    def update(self, intent, entities):
+        """Fold one turn's intent and entities into the state"""
+        self.turns += 1
+        self.intents.append(intent)
+        if intent not in NO_TOPIC:
+            if self.topic is not None and intent != self.topic:
+                for name in self.TOPIC_VALUES:
+                    setattr(self, name, None)
+            self.topic = intent
+        if "amount" in entities:
+            self.period = None
+        if "age" in entities:
+            self.profile_age = None
+        for name, value in entities.items():
+            setattr(self, name, value)
+
+    def context(self):
+        """Known values as a dict, omitting anything not yet mentioned"""
+        return {name: getattr(self, name) for name in self.VALUES if getattr(self, name) is not None}
+
+    def monthly_amount(self):
+        """The amount per month, or None unless it was stated with a period"""
+        if self.amount is None or self.period is None:
+            return None
+        return self.amount / 12 if self.period == "year" else self.amount
+
+    def apply(self, profile, intent):
+        """Copy of profile with the conversation's values filled in for intent
+
+        A stated age applies to every answer until the profile's own age
+        changes (the sidebar slider moves), which then wins. An amount stated
+        per month or year is the extra debt payment for debt questions, the
+        contribution for retirement ones and the income for tax ones. An
+        amount with no period is a balance: the savings so far for
+        retirement questions, and left alone otherwise. Savings and investing
+        read them from the "context" entry.
+        """
+        if self.age is not None:
+            if self.profile_age is None:
+                self.profile_age = profile.get("age")
+            elif profile.get("age") != self.profile_age:
+                self.age = None
+        context = self.context()
+        if not context:
+            return profile
+        profile = dict(profile, context=context)
+        if self.age is not None:
+            profile["age"] = self.age
+        monthly = self.monthly_amount()
+        if intent == "debt" and monthly is not None:
+            profile["extra_payment"] = monthly
+        elif intent == "retirement":
+            if self.retirement_age is not None:
+                profile["retirement_age"] = self.retirement_age
+            if self.rate is not None:
+                profile["contribution_rate"] = self.rate
+            elif monthly is not None and profile.get("income"):
+                profile["contribution_rate"] = min(monthly / profile["income"] * 100, 100)
+            if self.amount is not None and self.period is None:
+                profile["retirement_savings"] = self.amount
+        elif intent == "taxes" and monthly is not None:
+            profile["income"] = monthly
+        return profile
+
+
+def describe_duration(months):
+    """'1 month', '18 months', '1 year', '2.5 years'"""
+    if months == 1:
+        return "1 month"
+    if months % 12:
+        return f"{months / 12:g} years" if months > 12 and months % 6 == 0 else f"{months} months"
+    years = months // 12
+    return f"{years} year" if years == 1 else f"{years} years"
+
+
+def future_value(monthly, annual_rate, months):
+    """Balance after depositing monthly for months at annual_rate (percent), compounded monthly"""
+    rate = annual_rate / 100 / 12
+    if not rate:
+        return monthly * months
+    return monthly * ((1 + rate) ** months - 1) / rate
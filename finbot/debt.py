@@ -0,0 +1,221 @@
+import numpy as np
+
+
+STRATEGIES = ("avalanche", "snowball")
+MAX_MONTHS = 600
+_PAID = 0.005
+
+
+def strategy_order(balances, aprs, strategy):
+    """Indices of the debts in the order a strategy targets them"""
+    balances = np.asarray(balances, dtype=np.float64)
+    aprs = np.asarray(aprs, dtype=np.float64)
+    if strategy == "avalanche":
+        return np.lexsort((balances, -aprs))
+    if strategy == "snowball":
+        return np.lexsort((-aprs, balances))
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+class PayoffResult:
+    """Outcome of simulate() for S scenarios over D debts"""
+
+    def __init__(self, months, payoff_month, total_interest, total_paid, balances):
+        self.months = months
+        self.payoff_month = payoff_month
+        self.total_interest = total_interest
+        self.total_paid = total_paid
+        self.balances = balances
+
+    @property
+    def paid_off(self):
+        return self.months <= MAX_MONTHS
+
+
+def simulate(balances, aprs, minimums, budgets, orders, max_months=MAX_MONTHS, keep_schedule=False):
+    """Amortize every debt under every scenario at once
+
+    balances, aprs (in percent) and minimums are (D,) or (S, D) arrays,
+    budgets is the total monthly payment per scenario (S,), and orders is
+    (S, D) holding each scenario's debt indices in payoff priority. Each
+    month interest accrues, every debt gets its minimum, and whatever is
+    left of the budget (including minimums freed by paid-off debts) goes to
+    the highest-priority debts in turn. The loop runs over months only;
+    debts and scenarios are array axes.
+
+    Scenarios still in debt after max_months report max_months + 1.
+    """
+    orders = np.atleast_2d(np.asarray(orders, dtype=np.int64))
+    budgets = np.atleast_1d(np.asarray(budgets, dtype=np.float64))
+    shape = (max(len(budgets), len(orders)), orders.shape[1])
+    balance = np.array(np.broadcast_to(balances, shape), dtype=np.float64)
+    rate = np.broadcast_to(np.asarray(aprs, dtype=np.float64) / 1200.0, shape)
+    minimum = np.broadcast_to(np.asarray(minimums, dtype=np.float64), shape)
+    budgets = np.broadcast_to(budgets, shape[:1])
+    orders = np.broadcast_to(orders, shape)
+
+    payoff_month = np.where(balance > _PAID, max_months + 1, 0)
+    total_interest = np.zeros(shape[0])
+    total_paid = np.zeros(shape[0])
+    schedule = [balance.copy()] if keep_schedule else None
+    extra = np.empty(shape)
+
+    for month in range(1, max_months + 1):
+        if not (balance > _PAID).any():
+            break
+        interest = balance * rate
+        balance += interest
+        total_interest += interest.sum(axis=1)
+
+        payment = np.minimum(minimum, balance)
+        remaining = np.maximum(budgets - payment.sum(axis=1), 0.0)
+        left = np.take_along_axis(balance - payment, orders, axis=1)
+        ahead = np.cumsum(left, axis=1) - left
+        np.put_along_axis(extra, orders, np.clip(remaining[:, None] - ahead, 0.0, left), axis=1)
+        payment += extra
+
+        balance -= payment
+        total_paid += payment.sum(axis=1)
+        cleared = balance <= _PAID
+        balance[cleared] = 0.0
+        payoff_month[cleared & (payoff_month > max_months)] = month
+        if keep_schedule:
+            schedule.append(balance.copy())
+
+    return PayoffResult(
+        months=payoff_month.max(axis=1) if shape[1] else np.zeros(shape[0], dtype=np.int64),
+        payoff_month=payoff_month,
+        total_interest=total_interest,
+        total_paid=total_paid,
+        balances=np.stack(schedule) if keep_schedule else None
+    )
+
+
+def parse_debts(debts):
+    """Keep usable {name, balance, apr, minimum} rows as parallel arrays"""
+    rows = [debt for debt in debts or [] if (debt.get("balance") or 0) > 0]
+    names = [str(debt.get("name") or f"Debt {index + 1}") for index, debt in enumerate(rows)]
+    balances = np.array([float(debt["balance"]) for debt in rows])
+    aprs = np.array([float(debt.get("apr") or 0) for debt in rows])
+    minimums = np.array([float(debt.get("minimum") or 0) for debt in rows])
+    return names, balances, aprs, minimums
+
+
+class PayoffComparison:
+    """Side-by-side payoff schedules for several strategies on one set of debts"""
+
+    def __init__(self, debts, extra_payment=0, custom_order=None):
+        self.names, self.balances, self.aprs, self.minimums = parse_debts(debts)
+        self.extra_payment = float(extra_payment or 0)
+        self.budget = self.minimums.sum() + self.extra_payment
+
+        self.strategies = list(STRATEGIES)
+        orders = [strategy_order(self.balances, self.aprs, strategy) for strategy in STRATEGIES]
+        if custom_order is not None:
+            self.strategies.append("custom")
+            orders.append(np.asarray(custom_order, dtype=np.int64))
+
+        self.result = simulate(
+            self.balances, self.aprs, self.minimums,
+            np.full(len(orders), self.budget), np.array(orders), keep_schedule=True
+        )
+
+    def __bool__(self):
+        return len(self.names) > 0
+
+    def summary(self):
+        """One row per strategy: months to payoff, interest and total paid"""
+        result = self.result
+        return [
+            {
+                "strategy": strategy,
+                "months": int(result.months[index]),
+                "paid_off": bool(result.paid_off[index]),
+                "total_interest": float(result.total_interest[index]),
+                "total_paid": float(result.total_paid[index])
+            }
+            for index, strategy in enumerate(self.strategies)
+        ]
+
+    def table(self):
+        """Summary rows with each debt's payoff month added, as plain values"""
+        rows = self.summary()
+        for row, months in zip(rows, self.result.payoff_month):
+            for name, month in zip(self.names, months):
+                row[f"{name} paid off (month)"] = int(month)
+        return rows
+
+    def to_frame(self):
+        """Summary as a pandas DataFrame, with per-debt payoff months"""
+        import pandas as pd
+
+        return pd.DataFrame(self.table()).set_index("strategy")
+
+    def schedule_frame(self):
+        """Month-by-month remaining balance per strategy and debt, long format"""
+        import pandas as pd
+
+        balances = self.result.balances
+        months, strategies, debts = balances.shape
+        return pd.DataFrame({
+            "month": np.repeat(np.arange(months), strategies * debts),
+            "strategy": np.tile(np.repeat(self.strategies, debts), months),
+            "debt": np.tile(self.names, months * strategies),
+            "balance": balances.ravel()
+        })
+
+    def balance_totals(self):
+        """{strategy: total remaining balance by month until paid off}, enough to redraw figure() later"""
+        totals = self.result.balances.sum(axis=2)
+        return {
+            strategy: totals[:int(min(self.result.months[index], len(totals) - 1)) + 1, index].tolist()
+            for index, strategy in enumerate(self.strategies)
+        }
+
+    def figure(self):
+        """Plotly line chart of total remaining balance under each strategy"""
+        return balance_chart(self.balance_totals())
+
+
+def balance_chart(totals):
+    """Plotly line chart of {strategy: remaining balance by month}"""
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    for strategy, balances in totals.items():
+        figure.add_trace(go.Scatter(
+            x=list(range(len(balances))), y=balances, mode="lines", name=strategy.title()
+        ))
+    figure.update_layout(
+        xaxis_title="Month", yaxis_title="Remaining balance ($)",
+        margin=dict(l=10, r=10, t=30, b=10), height=320
+    )
+    return figure
+
+
+def what_if(debts, extra_payments, strategies=STRATEGIES):
+    """Months to payoff and total interest for every (strategy, extra payment) pair
+
+    Returns two (len(strategies), len(extra_payments)) arrays; all scenarios
+    are simulated in one call.
+    """
+    names, balances, aprs, minimums = parse_debts(debts)
+    extra_payments = np.asarray(extra_payments, dtype=np.float64)
+    orders = np.array([strategy_order(balances, aprs, strategy) for strategy in strategies])
+    result = simulate(
+        balances, aprs, minimums,
+        np.tile(minimums.sum() + extra_payments, len(strategies)),
+        np.repeat(orders, len(extra_payments), axis=0)
+    )
+    shape = (len(strategies), len(extra_payments))
+    return result.months.reshape(shape), result.total_interest.reshape(shape)
+
+
+def format_months(months):
+    """Render a month count as e.g. '2 yr 3 mo'"""
+    if months > MAX_MONTHS:
+        return f"over {MAX_MONTHS // 12} years"
+    years, months = divmod(int(months), 12)
+    if not years:
+        return f"{months} mo"
+    return f"{years} yr {months} mo" if months else f"{years} yr"
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+HISTORY_DIR = os.getenv("CHAT_HISTORY_DIR", os.path.join(tempfile.gettempdir(), "finbot-history"))
+# Transcripts untouched for this many hours belong to ended sessions.
+HISTORY_MAX_AGE = float(os.getenv("CHAT_HISTORY_MAX_AGE_HOURS", "24")) * 3600
+SWEEP_INTERVAL = 3600
+
+_swept_at = 0.0
+_sweep_lock = threading.Lock()
+
+
+def sweep_history(directory=HISTORY_DIR, max_age=HISTORY_MAX_AGE, force=False):
+    """Delete transcript files not written to within max_age seconds
+
+    Streamlit gives no hook when a session ends, so abandoned per-session
+    files are removed by age instead. Runs at most once per SWEEP_INTERVAL
+    per process unless forced; returns the number of files removed.
+    """
+    global _swept_at
+    now = time.time()
+    with _sweep_lock:
+        if not force and now - _swept_at < SWEEP_INTERVAL:
+            return 0
+        _swept_at = now
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith((".sqlite3", ".sqlite3-journal")):
+            continue
+        try:
+            if now - entry.stat().st_mtime > max_age:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # Removed by another process, or still locked on some platforms.
+            pass
+    return removed
+
+
+class ChatHistory:
+    """Chat transcript that keeps only a recent window in memory.
+
+    Turns that fall out of the window are spilled to a per-session SQLite
+    file and only read back, a page at a time, when the user asks for
+    earlier messages. At most max_pages pages are loaded back at once, so
+    memory and render cost stay flat however long the conversation gets.
+    """
+
+    def __init__(self, path, window=50, page_size=50, max_pages=10):
+        self.path = path
+        self.window = window
+        self.page_size = page_size
+        self.max_earlier = page_size * max_pages
+        self.recent = deque()
+        self.earlier = []
+        self.spilled = 0
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def _db(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages (seq INTEGER PRIMARY KEY, role TEXT, content TEXT)"
+            )
+        return self.connection
+
+    def append(self, role, content, **extra):
+        """Add a turn, spilling the oldest in-memory turn if the window is full
+
+        Extra fields (e.g. data for a chart) are kept while the turn is in
+        memory; only the role and text are spilled.
+        """
+        with self.lock:
+            self.recent.append(dict(extra, role=role, content=content))
+            if len(self.recent) > self.window:
+                message = self.recent.popleft()
+                db = self._db()
+                with db:
+                    db.execute(
+                        "INSERT INTO messages (seq, role, content) VALUES (?, ?, ?)",
+                        (self.spilled, message["role"], message["content"])
+                    )
+                self.spilled += 1
+                # Keep a paged-back view contiguous with the live window,
+                # dropping its oldest turns once it is full.
+                if self.earlier:
+                    self.earlier.append(message)
+                    if len(self.earlier) > self.max_earlier:
+                        del self.earlier[:self.page_size]
+
+    def has_earlier(self):
+        """Whether another page of spilled turns can be loaded"""
+        return len(self.earlier) < min(self.spilled, self.max_earlier)
+
+    def load_earlier(self):
+        """Read the previous page of spilled turns back into memory, up to max_pages pages"""
+        with self.lock:
+            end = self.spilled - len(self.earlier)
+            room = self.max_earlier - len(self.earlier)
+            if end <= 0 or room <= 0:
+                return []
+            start = max(0, end - min(self.page_size, room))
+            rows = self._db().execute(
+                "SELECT role, content FROM messages WHERE seq >= ? AND seq < ? ORDER BY seq",
+                (start, end)
+            ).fetchall()
+            page = [{"role": role, "content": content} for role, content in rows]
+            self.earlier[:0] = page
+            return page
+
+    def collapse(self):
+        """Drop loaded pages and go back to showing only the recent window"""
+        with self.lock:
+            self.earlier = []
+
+    def visible(self):
+        """Turns to render: any loaded pages followed by the recent window"""
+        with self.lock:
+            return self.earlier + list(self.recent)
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def close(self, delete=False):
+        """Close the SQLite file, optionally removing it"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+            if delete and os.path.exists(self.path):
+                os.remove(self.path)
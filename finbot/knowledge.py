@@ -0,0 +1,192 @@
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .matcher import KeywordMatcher
+
+
+KNOWLEDGE_PATH = os.getenv(
+    "KNOWLEDGE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge.jsonl")
+)
+KNOWLEDGE_FORMAT = "finbot-knowledge/1"
+RELOAD_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "2"))
+
+_TOPIC_PREFIX = re.compile(rb'\{\s*"topic"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def freeze(value):
+    """Recursively convert dicts and lists into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(key): freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def iter_tips(value):
+    """Yield every tip string in a nested table, in declaration order"""
+    if isinstance(value, str):
+        yield value
+    elif hasattr(value, "values"):
+        for item in value.values():
+            yield from iter_tips(item)
+    else:
+        for item in value:
+            yield from iter_tips(item)
+
+
+def file_signature(path):
+    """Identify a file revision cheaply, without reading it"""
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class KnowledgeFile:
+    """Memory-mapped knowledge base file, parsed one topic at a time.
+
+    The file is JSON Lines. The first line is a header holding the format,
+    version, intent keywords, quick responses and general tips. Every other
+    line is one {"topic", "audience", "tips"} record. Opening the file only
+    parses the header and records the byte span of each topic's lines.
+
+    Replace the file atomically (write a copy, then os.replace) rather than
+    editing it in place: an open map keeps reading the old revision.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self.signature = file_signature(path)
+            self.data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        end = self.data.find(b"\n")
+        end = len(self.data) if end < 0 else end
+        self.header = json.loads(self.data[:end].decode("utf-8"))
+        if self.header.get("format") != KNOWLEDGE_FORMAT:
+            raise ValueError(f"{path} is not a {KNOWLEDGE_FORMAT} file")
+
+        self.spans = {}
+        start = end + 1
+        while start < len(self.data):
+            end = self.data.find(b"\n", start)
+            end = len(self.data) if end < 0 else end
+            if self.data[start:end].strip():
+                match = _TOPIC_PREFIX.match(self.data, start, end)
+                if match:
+                    topic = json.loads(b'"' + match.group(1) + b'"')
+                else:
+                    topic = json.loads(self.data[start:end].decode("utf-8"))["topic"]
+                self.spans.setdefault(topic, []).append((start, end))
+            start = end + 1
+
+    def read_topic(self, topic):
+        """Parse one topic into {audience: tips} or a plain list of tips"""
+        records = [json.loads(self.data[start:end].decode("utf-8")) for start, end in self.spans[topic]]
+        if len(records) == 1 and "audience" not in records[0]:
+            return records[0]["tips"]
+        return {record["audience"]: record["tips"] for record in records}
+
+
+class LazyTopics(Mapping):
+    """Read-only topic table that parses each topic on first access"""
+
+    def __init__(self, source):
+        self.source = source
+        self.loaded = {}
+        self.lock = threading.Lock()
+
+    def __getitem__(self, topic):
+        value = self.loaded.get(topic)
+        if value is None:
+            if topic not in self.source.spans:
+                raise KeyError(topic)
+            with self.lock:
+                value = self.loaded.get(topic)
+                if value is None:
+                    value = self.loaded[topic] = freeze(self.source.read_topic(topic))
+        return value
+
+    def __iter__(self):
+        return iter(self.source.spans)
+
+    def __len__(self):
+        return len(self.source.spans)
+
+
+class KnowledgeStore:
+    """Read-only advice tables with the keyword matcher and search index built over them
+
+    Topics load on first use; the search index, which needs every tip, is
+    built the first time a general question asks for it.
+    """
+
+    def __init__(self, path=KNOWLEDGE_PATH):
+        self.source = KnowledgeFile(path)
+        header = self.source.header
+        self.signature = self.source.signature
+        self.version = f"{header.get('version', 0)}:{self.signature[2]}:{self.signature[1]}"
+        self.knowledge_base = LazyTopics(self.source)
+        self.quick_responses = freeze(header["quick_responses"])
+        self.general_tips = freeze(header["general_tips"])
+        self.intent_keywords = freeze(header["intent_keywords"])
+        self.matcher = KeywordMatcher({
+            "intent": self.intent_keywords,
+            "quick": {keyword: [keyword] for keyword in self.quick_responses}
+        })
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    from .retrieval import BM25Index
+
+                    self._index = BM25Index(dict.fromkeys(
+                        list(iter_tips(self.knowledge_base)) + list(iter_tips(self.quick_responses))
+                        + list(self.general_tips)
+                    ))
+        return self._index
+
+
+_shared_store = None
+_checked_at = 0.0
+_shared_lock = threading.Lock()
+
+
+def shared_store():
+    """Return the process-wide KnowledgeStore, reloading it if the file changed
+
+    The file is checked at most every RELOAD_INTERVAL seconds. A changed file
+    is opened into a new store that replaces the old one in a single
+    assignment, so callers holding the old store keep a consistent view. If
+    the new revision fails to load, the old store stays in service.
+    """
+    global _shared_store, _checked_at
+    store = _shared_store
+    if store is not None and time.monotonic() - _checked_at < RELOAD_INTERVAL:
+        return store
+    with _shared_lock:
+        store = _shared_store
+        if store is not None and time.monotonic() - _checked_at < RELOAD_INTERVAL:
+            return store
+        _checked_at = time.monotonic()
+        try:
+            changed = store is None or file_signature(store.source.path) != store.signature
+            if changed:
+                _shared_store = KnowledgeStore(store.source.path if store else KNOWLEDGE_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            if store is None:
+                raise
+            print(f"Keeping knowledge base {store.version}: reload failed ({e})", file=sys.stderr)
+        return _shared_store
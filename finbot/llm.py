@@ -0,0 +1,257 @@
+import asyncio
+import importlib.util
+import json
+import os
+import queue
+import threading
+
+
+DEFAULT_API_URL = "https://router.huggingface.co/v1/chat/completions"
+DEFAULT_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+# The key shipped in .env; a checkout that hasn't replaced it has no key.
+PLACEHOLDER_API_KEY = "your_actual_api_key_here"
+
+SYSTEM_PROMPT = (
+    "You are a friendly personal finance assistant. Answer in a few short "
+    "paragraphs, build on the reference advice you are given, and never "
+    "recommend specific securities."
+)
+CUT_OFF_NOTICE = "\n\n⚠️ *The answer was cut off. Ask again if you'd like the rest.*"
+
+
+class LLMError(Exception):
+    """The generation backend failed or returned an unusable response"""
+
+
+class _Flight:
+    """One upstream request whose tokens can be replayed to many readers"""
+
+    def __init__(self):
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Condition()
+        # The request task; the loop only keeps a weak reference to it.
+        self.task = None
+
+    async def push(self, token):
+        async with self.changed:
+            self.tokens.append(token)
+            self.changed.notify_all()
+
+    async def finish(self, error=None):
+        async with self.changed:
+            self.done = True
+            self.error = error
+            self.changed.notify_all()
+
+    async def subscribe(self):
+        index = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.done or len(self.tokens) > index)
+                tokens = self.tokens[index:]
+                finished = self.done
+                error = self.error
+            index += len(tokens)
+            for token in tokens:
+                yield token
+            if finished:
+                if error is not None:
+                    raise error
+                return
+
+
+class HuggingFaceBackend:
+    """Streaming chat-completions client for the Hugging Face router.
+
+    Any OpenAI-compatible endpoint works, including the local stub in
+    tools/stub_llm_server.py. One pooled httpx.AsyncClient is shared by all
+    requests, a semaphore caps concurrent upstream calls, and identical
+    prompts already in flight share a single upstream stream.
+    """
+
+    def __init__(self, api_key, api_url=DEFAULT_API_URL, model=DEFAULT_MODEL,
+                 max_concurrency=8, request_timeout=30.0, max_tokens=300):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.max_tokens = max_tokens
+        self.client = None
+        self.semaphore = None
+        self.in_flight = {}
+
+    def _ensure_client(self):
+        if self.client is None:
+            import httpx
+
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.request_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _request(self, messages, flight):
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+            "stream": True
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with self.semaphore:
+            async with self.client.stream("POST", self.api_url, json=payload, headers=headers) as response:
+                if response.status_code != 200:
+                    raise LLMError(f"Backend returned HTTP {response.status_code}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta", {})
+                    except (ValueError, KeyError, IndexError) as e:
+                        raise LLMError(f"Malformed stream chunk: {data[:80]}") from e
+                    if delta.get("content"):
+                        await flight.push(delta["content"])
+
+    async def _run(self, key, messages, flight):
+        error = None
+        try:
+            await asyncio.wait_for(self._request(messages, flight), self.request_timeout)
+        except asyncio.TimeoutError:
+            error = LLMError(f"Backend timed out after {self.request_timeout}s")
+        except Exception as e:
+            error = e if isinstance(e, LLMError) else LLMError(str(e) or type(e).__name__)
+        finally:
+            self.in_flight.pop(key, None)
+            await flight.finish(error)
+
+    async def stream(self, messages):
+        """Yield generated tokens, joining an identical in-flight request if any"""
+        self._ensure_client()
+        key = json.dumps(messages, sort_keys=True)
+        flight = self.in_flight.get(key)
+        if flight is None:
+            flight = _Flight()
+            self.in_flight[key] = flight
+            flight.task = asyncio.ensure_future(self._run(key, messages, flight))
+        async for token in flight.subscribe():
+            yield token
+
+
+class GenerationService:
+    """Runs an async backend on a background event loop for sync callers.
+
+    Streamlit reruns are synchronous, so requests are submitted to one
+    long-lived loop thread (keeping the HTTP pool warm across reruns) and
+    tokens are handed back through a queue. If the first token does not
+    arrive within the latency budget, or the backend fails, the rule-based
+    answer is returned instead. Once tokens are flowing, the whole answer
+    must finish within total_budget; a stream that stalls or fails after
+    that point ends with a short notice rather than the full fallback.
+    """
+
+    def __init__(self, backend, first_token_budget=3.0, total_budget=20.0):
+        self.backend = backend
+        self.first_token_budget = first_token_budget
+        self.total_budget = total_budget
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="llm-loop", daemon=True)
+        self.thread.start()
+
+    async def _generate(self, messages, fallback, out):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.total_budget
+        tokens = self.backend.stream(messages)
+        produced = False
+        try:
+            budget = min(self.first_token_budget, self.total_budget)
+            while True:
+                out.put(await asyncio.wait_for(tokens.__anext__(), budget))
+                produced = True
+                budget = deadline - loop.time()
+        except StopAsyncIteration:
+            pass
+        except Exception:
+            out.put(CUT_OFF_NOTICE if produced else fallback)
+            return
+        finally:
+            await tokens.aclose()
+        if not produced:
+            out.put(fallback)
+
+    def stream(self, messages, fallback):
+        """Yield response text chunks, falling back to the given answer"""
+        out = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                await self._generate(messages, fallback, out)
+            finally:
+                out.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                chunk = out.get()
+                if chunk is done:
+                    break
+                yield chunk
+        finally:
+            future.cancel()
+
+
+def build_messages(user_message, user_profile, reference_advice):
+    """Build the chat prompt from the question, profile and rule-based answer"""
+    profile = (
+        f"type: {user_profile.get('type', 'general')}, age: {user_profile.get('age', 25)}, "
+        f"monthly income: ${user_profile.get('income', 0):,}, "
+        f"goals: {', '.join(user_profile.get('goals', [])) or 'none'}"
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"My profile: {profile}\n\nReference advice: {reference_advice}\n\nQuestion: {user_message}"}
+    ]
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def shared_generation_service():
+    """Return the process-wide GenerationService, or None if not configured
+
+    The backend is off unless LLM_ENABLED=1, so user messages never leave
+    the machine by default. It also needs a real HF_API_KEY and httpx.
+    HF_API_URL and HF_MODEL point it at another endpoint or model.
+    """
+    global _shared_service
+    if os.getenv("LLM_ENABLED", "") in ("", "0"):
+        return None
+    api_key = os.getenv("HF_API_KEY", "").strip()
+    if api_key in ("", PLACEHOLDER_API_KEY) or importlib.util.find_spec("httpx") is None:
+        return None
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                backend = HuggingFaceBackend(
+                    api_key,
+                    api_url=os.getenv("HF_API_URL", DEFAULT_API_URL),
+                    model=os.getenv("HF_MODEL", DEFAULT_MODEL),
+                    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                    request_timeout=float(os.getenv("LLM_TIMEOUT", "30"))
+                )
+                _shared_service = GenerationService(
+                    backend,
+                    first_token_budget=float(os.getenv("LLM_FIRST_TOKEN_BUDGET", "3")),
+                    total_budget=float(os.getenv("LLM_TOTAL_BUDGET", "20"))
+                )
+    return _shared_service
@@ -0,0 +1,94 @@
+import re
+
+
+_WORD_START = re.compile(r"(?<!\w)\S")
+_END = ""
+
+
+class KeywordMatcher:
+    """Precompiled keyword trie shared by intent and quick-response lookup.
+
+    Keywords are grouped as {group: {label: [keywords]}} and compiled once.
+    A message is scanned in a single pass by walking the trie from every
+    word start, so a hit must begin on a word boundary but may end mid-word:
+    "owe" no longer fires inside "lower" while "loans" still matches "loan".
+    """
+
+    def __init__(self, groups):
+        self.root = {}
+        self.order = {}
+
+        owners = {}
+        for group, labels in groups.items():
+            for rank, (label, keywords) in enumerate(labels.items()):
+                self.order[(group, label)] = rank
+                for keyword in keywords:
+                    keyword = keyword.lower()
+                    owners.setdefault((group, keyword), [])
+                    if label not in owners[(group, keyword)]:
+                        owners[(group, keyword)].append(label)
+
+        # A keyword shared by several labels (e.g. "401k") is split evenly
+        # between them, so it never outweighs a keyword unique to one label.
+        for (group, keyword), labels in owners.items():
+            node = self.root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            weight = len(keyword) / len(labels)
+            node[_END] = node.get(_END, ()) + tuple(
+                (group, label, keyword, weight) for label in labels
+            )
+
+    def scan(self, text):
+        """Yield (position, group, label, keyword, weight) for every hit"""
+        root = self.root
+        length = len(text)
+        for start in _WORD_START.finditer(text):
+            position = start.start()
+            node = root
+            index = position
+            while index < length:
+                node = node.get(text[index])
+                if node is None:
+                    break
+                for hit in node.get(_END, ()):
+                    yield (position,) + hit
+                index += 1
+
+    def match(self, text):
+        """Scan a lowercased message once and score every group"""
+        return KeywordMatches(self, self.scan(text))
+
+
+class KeywordMatches:
+    """Scores from one scan, ranked per group.
+
+    A label scores the summed weight of the distinct keywords it matched.
+    Ties go to the label whose first hit appears earliest in the message,
+    then to the label declared first.
+    """
+
+    def __init__(self, matcher, hits):
+        self.order = matcher.order
+        self.keywords = {}
+        self.scores = {}
+        self.first_seen = {}
+        for position, group, label, keyword, weight in hits:
+            key = (group, label)
+            seen = self.keywords.setdefault(key, set())
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            self.scores[key] = self.scores.get(key, 0) + weight
+            self.first_seen.setdefault(key, position)
+
+    def ranked(self, group):
+        """Return [(label, score), ...] for a group, best first"""
+        keys = [key for key in self.scores if key[0] == group]
+        keys.sort(key=lambda key: (-self.scores[key], self.first_seen[key], self.order[key]))
+        return [(key[1], self.scores[key]) for key in keys]
+
+    def best(self, group, default=None):
+        """Return the top label of a group, or default if nothing matched"""
+        ranked = self.ranked(group)
+        return ranked[0][0] if ranked else default
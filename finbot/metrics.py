@@ -0,0 +1,165 @@
+import bisect
+import functools
+import os
+import tempfile
+import threading
+import time
+
+
+# Ten log-spaced buckets per decade from 1us to 10s.
+BUCKETS = tuple(10 ** (exponent / 10) for exponent in range(-60, 11))
+METRICS_FILE = os.getenv("FINBOT_METRICS_FILE", os.path.join(tempfile.gettempdir(), "finbot_metrics.prom"))
+
+
+class LatencyHistogram:
+    """Bucketed latency samples for one stage"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[index], self.maximum) if index < len(BUCKETS) else self.maximum
+        return self.maximum
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StageMetrics:
+    """Per-stage latency histograms, off unless enabled
+
+    When disabled, timed() hands back a shared no-op context manager and
+    the decorator calls straight through, so instrumentation costs a flag
+    check per stage.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def timed(self, stage):
+        """Context manager that records the block's latency under stage"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def timed_method(self, stage=None):
+        """Decorator that records each call's latency under stage"""
+        def decorate(func):
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def summary(self):
+        """One row per stage with count, mean, p50, p95, p99 and max in milliseconds"""
+        with self.lock:
+            histograms = dict(self.histograms)
+        return [
+            {
+                "stage": stage,
+                "count": histogram.count,
+                "mean_ms": histogram.total / histogram.count * 1e3,
+                "p50_ms": histogram.percentile(50) * 1e3,
+                "p95_ms": histogram.percentile(95) * 1e3,
+                "p99_ms": histogram.percentile(99) * 1e3,
+                "max_ms": histogram.maximum * 1e3
+            }
+            for stage, histogram in sorted(histograms.items())
+        ]
+
+    def to_prometheus(self, name="finbot_stage_latency_seconds"):
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {name} Latency of each get_response stage.",
+            f"# TYPE {name} histogram"
+        ]
+        with self.lock:
+            histograms = dict(self.histograms)
+        for stage, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=METRICS_FILE):
+        """Write the Prometheus text to path, replacing it atomically"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus())
+        os.replace(temporary, path)
+        return path
+
+
+METRICS = StageMetrics(enabled=os.getenv("FINBOT_METRICS", "") not in ("", "0"))
+timed = METRICS.timed
+timed_method = METRICS.timed_method
@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .cache import ResponseCache
+
+
+# Long-run real (after-inflation) annual return and volatility assumptions.
+STOCK_RETURN = 0.07
+STOCK_VOLATILITY = 0.16
+BOND_RETURN = 0.02
+BOND_VOLATILITY = 0.06
+CORRELATION = 0.1
+
+PERCENTILES = (10, 25, 50, 75, 90)
+DEFAULT_PATHS = int(os.getenv("RETIREMENT_PATHS", "20000"))
+DEFAULT_WORKERS = int(os.getenv("RETIREMENT_WORKERS", "1"))
+
+_projections = ResponseCache(maxsize=256)
+
+
+def portfolio_moments(stock_allocation):
+    """Monthly log-return mean and volatility of a stock/bond mix"""
+    weight = min(max(stock_allocation, 0.0), 1.0)
+    mean = weight * STOCK_RETURN + (1 - weight) * BOND_RETURN
+    variance = (
+        (weight * STOCK_VOLATILITY) ** 2 + ((1 - weight) * BOND_VOLATILITY) ** 2
+        + 2 * weight * (1 - weight) * CORRELATION * STOCK_VOLATILITY * BOND_VOLATILITY
+    )
+    return (np.log1p(mean) - variance / 2) / 12, np.sqrt(variance / 12)
+
+
+def _simulate_chunk(seed, paths, start_balance, contribution, withdrawal,
+                    accumulation_months, total_months, mean, volatility):
+    """Simulate one chunk of paths; returns (successes, yearly balances)"""
+    rng = np.random.default_rng(seed)
+    balance = np.full(paths, float(start_balance))
+    yearly = np.empty((paths, total_months // 12 + 1), dtype=np.float32)
+    yearly[:, 0] = balance
+    growth = None
+    for month in range(total_months):
+        if month % 12 == 0:
+            growth = np.exp(mean + volatility * rng.standard_normal((12, paths)))
+        balance *= growth[month % 12]
+        if month < accumulation_months:
+            balance += contribution
+        else:
+            balance -= withdrawal
+            np.maximum(balance, 0.0, out=balance)
+        if month % 12 == 11:
+            yearly[:, month // 12 + 1] = balance
+    return int((balance > 0).sum()), yearly
+
+
+class RetirementProjection:
+    """Monte Carlo outcome: success probability and balance percentile bands"""
+
+    def __init__(self, ages, bands, success_probability, retirement_age, contribution, withdrawal, paths):
+        self.ages = ages
+        self.bands = bands
+        self.success_probability = success_probability
+        self.retirement_age = retirement_age
+        self.contribution = contribution
+        self.withdrawal = withdrawal
+        self.paths = paths
+
+    def band_at(self, age):
+        """Percentile balances {percentile: balance} at a given age"""
+        column = int(np.clip(age - self.ages[0], 0, len(self.ages) - 1))
+        return {percentile: float(self.bands[row, column]) for row, percentile in enumerate(PERCENTILES)}
+
+    def chart_data(self):
+        """Ages, bands and retirement age as plain lists, enough to redraw figure() later"""
+        return {"ages": self.ages.tolist(), "bands": self.bands.tolist(), "retirement_age": self.retirement_age}
+
+    def figure(self):
+        """Plotly fan chart of the percentile bands by age"""
+        return fan_chart(**self.chart_data())
+
+
+def fan_chart(ages, bands, retirement_age):
+    """Plotly fan chart of percentile bands (one row per PERCENTILES entry) by age"""
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    outer, inner, median = (0, 4), (1, 3), 2
+    for (low, high), opacity in ((outer, 0.15), (inner, 0.3)):
+        figure.add_trace(go.Scatter(x=ages, y=bands[high], mode="lines", line=dict(width=0),
+                                    showlegend=False, hoverinfo="skip"))
+        figure.add_trace(go.Scatter(
+            x=ages, y=bands[low], mode="lines", line=dict(width=0), fill="tonexty",
+            fillcolor=f"rgba(31, 119, 180, {opacity})",
+            name=f"{PERCENTILES[low]}th-{PERCENTILES[high]}th percentile"
+        ))
+    figure.add_trace(go.Scatter(x=ages, y=bands[median], mode="lines", name="Median"))
+    figure.add_vline(x=retirement_age, line_dash="dot")
+    figure.update_layout(
+        xaxis_title="Age", yaxis_title="Savings (today's $)",
+        margin=dict(l=10, r=10, t=30, b=10), height=320
+    )
+    return figure
+
+
+def projection_inputs(profile):
+    """project_retirement() arguments for a user profile, or None without an income"""
+    income = profile.get("income", 0) or 0
+    if income <= 0:
+        return None
+    return {
+        "age": profile.get("age", 25),
+        "monthly_income": income,
+        "contribution_rate": profile.get("contribution_rate", 10) / 100,
+        "stock_allocation": profile.get("stock_allocation", 80) / 100,
+        "current_savings": profile.get("retirement_savings", 0) or 0,
+        "retirement_age": profile.get("retirement_age", 65)
+    }
+
+
+def project_retirement(age, monthly_income, contribution_rate=0.10, stock_allocation=0.8,
+                       current_savings=0, retirement_age=65, horizon_age=95, replacement_ratio=0.7,
+                       paths=DEFAULT_PATHS, chunk_size=10000, seed=0, workers=DEFAULT_WORKERS):
+    """Simulate savings paths from today until horizon_age
+
+    Savers contribute contribution_rate of monthly income until
+    retirement_age, then withdraw replacement_ratio of it each month. A path
+    succeeds if money remains at horizon_age. Paths run in chunks of
+    chunk_size, so memory is bounded by paths x years rather than paths x
+    months, and each chunk has its own seed derived from seed, so results
+    are identical whether chunks run in-process or across workers. Repeat
+    calls with the same inputs are served from a cache.
+    """
+    key = (age, monthly_income, contribution_rate, stock_allocation, current_savings,
+           retirement_age, horizon_age, replacement_ratio, paths, chunk_size, seed)
+    cached = _projections.get(key)
+    if cached is not None:
+        return cached
+
+    years = max(int(horizon_age - age), 1)
+    total_months = years * 12
+    accumulation_months = min(max(int(retirement_age - age), 0) * 12, total_months)
+    contribution = monthly_income * contribution_rate
+    withdrawal = monthly_income * replacement_ratio
+    mean, volatility = portfolio_moments(stock_allocation)
+
+    sizes = [chunk_size] * (paths // chunk_size) + ([paths % chunk_size] if paths % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [
+        (chunk_seed, size, current_savings, contribution, withdrawal,
+         accumulation_months, total_months, mean, volatility)
+        for chunk_seed, size in zip(seeds, sizes)
+    ]
+    if workers and workers > 1 and len(arguments) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*arguments)))
+    else:
+        chunks = [_simulate_chunk(*chunk) for chunk in arguments]
+
+    successes = sum(count for count, _ in chunks)
+    yearly = np.concatenate([balances for _, balances in chunks])
+    projection = RetirementProjection(
+        ages=np.arange(age, age + years + 1),
+        bands=np.percentile(yearly, PERCENTILES, axis=0),
+        success_probability=successes / paths,
+        retirement_age=retirement_age,
+        contribution=contribution,
+        withdrawal=withdrawal,
+        paths=paths
+    )
+    _projections.put(key, projection)
+    return projection
+
+
+def projection_stats():
+    """Hit and miss counters for the projection cache"""
+    return _projections.stats()
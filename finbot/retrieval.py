@@ -0,0 +1,92 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\([a-z]\))?")
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been before being but by can could did do
+does for from get got had has have how i if in into is it its just me more most my no not now
+of on or our out over should so some than that the their them then there these they this to too
+up us very was we were what when where which while who why will with would you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed and plurals folded"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        token = token.replace("(", "").replace(")", "")
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed corpus, stored as per-term posting arrays.
+
+    Each term's postings are a contiguous slice of two flat NumPy arrays
+    (document ids and precomputed BM25 weights), so scoring a query is one
+    gather over the query terms' slices and one bincount.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.documents = tuple(documents)
+        self.vocabulary = {}
+
+        term_ids = []
+        doc_ids = []
+        frequencies = []
+        lengths = np.zeros(len(self.documents), dtype=np.float64)
+        for doc_id, document in enumerate(self.documents):
+            counts = Counter(tokenize(document))
+            lengths[doc_id] = sum(counts.values())
+            for term, count in counts.items():
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+                frequencies.append(count)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+
+        order = np.argsort(term_ids, kind="stable")
+        term_ids = term_ids[order]
+        self.doc_ids = doc_ids[order]
+        frequencies = frequencies[order]
+
+        document_frequency = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.indptr = np.concatenate([[0], np.cumsum(document_frequency)])
+
+        count = max(len(self.documents), 1)
+        average_length = lengths.mean() if len(self.documents) else 1.0
+        idf = np.log1p((count - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths[self.doc_ids] / (average_length or 1.0))
+        self.weights = idf[term_ids] * frequencies * (k1 + 1) / (frequencies + norm)
+
+    def scores(self, query):
+        """Return the BM25 score of every document for a query"""
+        ids = np.asarray(sorted({self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary}),
+                         dtype=np.int64)
+        if not len(ids):
+            return np.zeros(len(self.documents))
+        starts = self.indptr[ids]
+        sizes = self.indptr[ids + 1] - starts
+        # Flat positions of every posting in the selected slices.
+        positions = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        return np.bincount(self.doc_ids[positions], weights=self.weights[positions],
+                           minlength=len(self.documents))
+
+    def search(self, query, k=5):
+        """Return up to k (document, score) pairs with a positive score, best first"""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.documents[i], float(scores[i])) for i in top if scores[i] > 0]
@@ -0,0 +1,108 @@
+"""Helpers shared by batch.py and server.py: worker setup, chunked answering and profile checks"""
+import math
+from itertools import islice
+
+from .chatbot import FinanceChatbot
+
+
+# Numeric profile fields and the range each must fall in.
+NUMBER_FIELDS = {
+    "income": (0, 1e9),
+    "age": (0, 120),
+    "extra_payment": (0, 1e9),
+    "retirement_savings": (0, 1e12),
+    "contribution_rate": (0, 100),
+    "stock_allocation": (0, 100),
+    "retirement_age": (0, 120)
+}
+DEBT_FIELDS = {"balance": (0, 1e12), "apr": (0, 100), "minimum": (0, 1e9)}
+SPENDING_FIELDS = ("income", "needs", "wants", "savings", "uncategorized", "transactions")
+
+_worker_bot = None
+
+
+def init_worker(seed):
+    """Pool initializer: give this worker its own FinanceChatbot"""
+    global _worker_bot
+    _worker_bot = FinanceChatbot(seed=seed)
+
+
+def respond_chunk(records):
+    """Answers for a list of {message, profile} records on this worker's chatbot"""
+    return _worker_bot.get_responses(
+        [record.get("message", "") for record in records],
+        [record.get("profile") or {} for record in records]
+    )
+
+
+def chunked(records, size):
+    """Group records into lists of at most size records"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _number(value, name, low, high):
+    if isinstance(value, bool):
+        raise ValueError(f'"{name}" must be a number')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'"{name}" must be a number')
+    if not math.isfinite(number) or not low <= number <= high:
+        raise ValueError(f'"{name}" must be between {low:,.0f} and {high:,.0f}')
+    return int(number) if number.is_integer() else number
+
+
+def clean_profile(profile):
+    """Copy of a client-supplied profile with numbers converted and checked
+
+    Numeric strings such as "4500" are accepted. Raises ValueError naming
+    the first bad field, so callers can reject the request instead of
+    failing halfway through an answer.
+    """
+    if not isinstance(profile, dict):
+        raise ValueError('"profile" must be an object')
+    profile = dict(profile)
+    # Filled in from the chat by ConversationState, never by clients.
+    profile.pop("context", None)
+    for name, (low, high) in NUMBER_FIELDS.items():
+        if profile.get(name) is not None:
+            profile[name] = _number(profile[name], name, low, high)
+    if profile.get("type") is not None and not isinstance(profile["type"], str):
+        raise ValueError('"type" must be a string')
+    if profile.get("filing_status") is not None:
+        from .taxes import FILING_STATUSES
+
+        if not isinstance(profile["filing_status"], str) or profile["filing_status"] not in FILING_STATUSES:
+            raise ValueError(f'"filing_status" must be one of {", ".join(FILING_STATUSES)}')
+    goals = profile.get("goals")
+    if goals is not None and (not isinstance(goals, list) or not all(isinstance(goal, str) for goal in goals)):
+        raise ValueError('"goals" must be a list of strings')
+
+    debts = profile.get("debts")
+    if debts is not None:
+        if not isinstance(debts, list):
+            raise ValueError('"debts" must be a list')
+        cleaned = []
+        for index, debt in enumerate(debts):
+            if not isinstance(debt, dict):
+                raise ValueError(f'"debts[{index}]" must be an object')
+            debt = dict(debt)
+            for name, (low, high) in DEBT_FIELDS.items():
+                if debt.get(name) is not None:
+                    debt[name] = _number(debt[name], f"debts[{index}].{name}", low, high)
+            cleaned.append(debt)
+        profile["debts"] = cleaned
+
+    spending = profile.get("spending")
+    if spending is not None:
+        if not isinstance(spending, dict):
+            raise ValueError('"spending" must be an object')
+        profile["spending"] = {
+            name: _number(spending.get(name), f"spending.{name}", 0, 1e12) for name in SPENDING_FIELDS
+        }
+    return profile
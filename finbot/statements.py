@@ -0,0 +1,164 @@
+import re
+
+from .matcher import KeywordMatcher
+
+
+CATEGORY_RULES = {
+    "savings": [
+        "transfer to savings", "savings transfer", "to savings", "vanguard", "fidelity", "schwab",
+        "betterment", "wealthfront", "robinhood", "401k", "ira contribution", "brokerage", "investment",
+        "certificate of deposit"
+    ],
+    "needs": [
+        "rent", "mortgage", "hoa", "electric", "utility", "utilities", "water", "gas bill", "power",
+        "internet", "comcast", "verizon", "at&t", "t-mobile", "phone", "insurance", "geico", "state farm",
+        "grocery", "groceries", "supermarket", "kroger", "safeway", "whole foods", "trader joe", "aldi",
+        "costco", "walmart", "target", "pharmacy", "cvs", "walgreens", "doctor", "medical", "dental",
+        "hospital", "tuition", "childcare", "daycare", "loan payment", "student loan", "car payment",
+        "transit", "metro", "fuel", "shell", "chevron", "exxon", "gas station", "irs", "tax payment"
+    ],
+    "wants": [
+        "restaurant", "cafe", "coffee", "starbucks", "dunkin", "mcdonald", "chipotle", "pizza", "doordash",
+        "uber eats", "grubhub", "brewery", "netflix", "spotify", "hulu", "disney", "hbo", "apple.com",
+        "steam", "playstation", "xbox", "amazon", "etsy", "ebay", "shopping", "clothing", "nike", "zara",
+        "sephora", "cinema", "theater", "concert", "ticketmaster", "travel", "airbnb", "hotel", "airline",
+        "uber", "lyft", "gym", "salon", "bookstore"
+    ]
+}
+
+DESCRIPTION_COLUMNS = ("description", "merchant", "payee", "name", "memo", "details", "transaction")
+AMOUNT_COLUMNS = ("amount", "value", "transaction amount")
+DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals", "money out")
+CREDIT_COLUMNS = ("credit", "deposit", "deposits", "money in")
+DATE_COLUMNS = ("date", "posted", "posting date", "transaction date", "posted date")
+
+# Distinct descriptions remembered across chunks before the memo is reset.
+MEMO_LIMIT = 200000
+
+_rules = KeywordMatcher({"category": CATEGORY_RULES})
+_CURRENCY = re.compile(r"[$,\s]")
+
+
+def categorize(description):
+    """Needs, wants, savings or uncategorized for one transaction description"""
+    return _rules.match(str(description).lower()).best("category", "uncategorized")
+
+
+def _find(columns, candidates):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def _to_amount(series):
+    import pandas as pd
+
+    if series.dtype.kind in "if":
+        return series.astype("float64")
+    text = series.astype(str).str.strip().str.replace(_CURRENCY, "", regex=True)
+    text = text.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+    return pd.to_numeric(text, errors="coerce")
+
+
+class SpendingBreakdown:
+    """Running needs/wants/savings totals folded in one chunk at a time"""
+
+    CATEGORIES = ("needs", "wants", "savings", "uncategorized")
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.CATEGORIES, 0.0)
+        self.income = 0.0
+        self.transactions = 0
+        self.first_date = None
+        self.last_date = None
+
+    def add(self, categories, spending, income, dates=None):
+        """Fold one chunk of categorized outflows and inflows into the totals"""
+        grouped = spending.groupby(categories).sum()
+        for category, total in grouped.items():
+            self.totals[category] += float(total)
+        self.income += float(income.sum())
+        self.transactions += len(income)
+        if dates is not None:
+            dates = dates.dropna()
+            if len(dates):
+                low, high = dates.min(), dates.max()
+                self.first_date = low if self.first_date is None else min(self.first_date, low)
+                self.last_date = high if self.last_date is None else max(self.last_date, high)
+
+    @property
+    def months(self):
+        """Months covered by the statement (at least one)"""
+        if self.first_date is None:
+            return 1.0
+        return max((self.last_date - self.first_date).days / 30.44, 1.0)
+
+    def monthly(self):
+        """Average monthly amount per category, plus income"""
+        result = {category: total / self.months for category, total in self.totals.items()}
+        result["income"] = self.income / self.months
+        return result
+
+    def to_profile(self):
+        """Compact, rounded monthly figures to store on the user profile"""
+        monthly = self.monthly()
+        monthly["transactions"] = self.transactions
+        return {key: round(value) for key, value in monthly.items()}
+
+
+def read_statement(source, chunksize=100000, expenses_negative=None):
+    """Stream a transaction CSV into a SpendingBreakdown
+
+    The file is read chunksize rows at a time, so memory stays bounded for
+    multi-million-row exports. Each distinct description is categorized
+    once per chunk and remembered across chunks. Outflows are taken from a
+    debit column if there is one, otherwise from the amount column's
+    negative values; if the first chunk has no negative amounts, positive
+    amounts are treated as spending instead (override with
+    expenses_negative).
+    """
+    import pandas as pd
+
+    breakdown = SpendingBreakdown()
+    known = {}
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, skipinitialspace=True):
+        columns = {str(column).strip().lower(): column for column in chunk.columns}
+        description = _find(columns, DESCRIPTION_COLUMNS)
+        if description is None:
+            raise ValueError("Statement needs a description, merchant or payee column")
+
+        debit = _find(columns, DEBIT_COLUMNS)
+        if debit is not None:
+            spending = _to_amount(chunk[debit]).fillna(0).abs()
+            credit = _find(columns, CREDIT_COLUMNS)
+            income = _to_amount(chunk[credit]).fillna(0).abs() if credit is not None else spending * 0
+        else:
+            amount_column = _find(columns, AMOUNT_COLUMNS)
+            if amount_column is None:
+                raise ValueError("Statement needs an amount column or debit/credit columns")
+            amount = _to_amount(chunk[amount_column]).fillna(0)
+            if expenses_negative is None:
+                expenses_negative = bool((amount < 0).any())
+            if not expenses_negative:
+                amount = -amount
+            spending = (-amount).clip(lower=0)
+            income = amount.clip(lower=0)
+
+        descriptions = chunk[description].fillna("").str.lower()
+        # Categorize this chunk into its own dict, so bounding the memo
+        # never drops a description the chunk still needs.
+        chunk_categories = {}
+        for text in descriptions.unique():
+            category = known.get(text)
+            chunk_categories[text] = categorize(text) if category is None else category
+        categories = descriptions.map(chunk_categories)
+        if len(known) + len(chunk_categories) > MEMO_LIMIT:
+            known.clear()
+        known.update(chunk_categories)
+
+        date = _find(columns, DATE_COLUMNS)
+        dates = pd.to_datetime(chunk[date], errors="coerce", format="mixed") if date is not None else None
+        outflows = spending > 0
+        breakdown.add(categories[outflows], spending[outflows], income, dates)
+    return breakdown
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+FILING_STATUSES = {
+    "single": "Single",
+    "married_joint": "Married filing jointly",
+    "married_separate": "Married filing separately",
+    "head_of_household": "Head of household"
+}
+
+RATES = (0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37)
+
+# US federal ordinary income brackets (lower bound of each rate) and
+# standard deductions. 2025 deductions include the July 2025 increase.
+BRACKETS = {
+    2024: {
+        "single": ((0, 11600, 47150, 100525, 191950, 243725, 609350), 14600),
+        "married_joint": ((0, 23200, 94300, 201050, 383900, 487450, 731200), 29200),
+        "married_separate": ((0, 11600, 47150, 100525, 191950, 243725, 365600), 14600),
+        "head_of_household": ((0, 16550, 63100, 100500, 191950, 243700, 609350), 21900)
+    },
+    2025: {
+        "single": ((0, 11925, 48475, 103350, 197300, 250525, 626350), 15750),
+        "married_joint": ((0, 23850, 96950, 206700, 394600, 501050, 751600), 31500),
+        "married_separate": ((0, 11925, 48475, 103350, 197300, 250525, 375800), 15750),
+        "head_of_household": ((0, 17000, 64850, 103350, 197300, 250500, 626350), 23625)
+    }
+}
+LATEST_YEAR = max(BRACKETS)
+
+
+class TaxTable:
+    """One year and filing status, with the tax owed at each bracket floor precomputed"""
+
+    def __init__(self, thresholds, rates, standard_deduction):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.base = np.concatenate([[0.0], np.cumsum(np.diff(self.thresholds) * self.rates[:-1])])
+        self.standard_deduction = float(standard_deduction)
+
+    def bracket(self, taxable):
+        """Index of the bracket each taxable income falls in"""
+        return np.searchsorted(self.thresholds, taxable, side="right") - 1
+
+    def tax(self, taxable):
+        """Tax owed on taxable income (scalar or array)"""
+        taxable = np.maximum(np.asarray(taxable, dtype=np.float64), 0.0)
+        index = self.bracket(taxable)
+        return self.base[index] + (taxable - self.thresholds[index]) * self.rates[index]
+
+
+TABLES = {
+    (year, status): TaxTable(thresholds, RATES, deduction)
+    for year, statuses in BRACKETS.items()
+    for status, (thresholds, deduction) in statuses.items()
+}
+
+
+class TaxEstimate:
+    """Federal income tax for one or many gross incomes"""
+
+    def __init__(self, income, taxable, tax, marginal_rate, standard_deduction, filing_status, year):
+        self.income = income
+        self.taxable = taxable
+        self.tax = tax
+        self.marginal_rate = marginal_rate
+        self.standard_deduction = standard_deduction
+        self.filing_status = filing_status
+        self.year = year
+
+    @property
+    def effective_rate(self):
+        return np.divide(self.tax, self.income, out=np.zeros_like(self.tax), where=self.income > 0)
+
+    @property
+    def take_home(self):
+        return self.income - self.tax
+
+
+def estimate_tax(annual_income, filing_status="single", year=LATEST_YEAR, pretax_contributions=0):
+    """Estimate federal income tax with the standard deduction
+
+    annual_income may be a scalar or an array; a whole income range is
+    evaluated in one vectorized bracket lookup. Pre-tax contributions
+    (traditional 401(k)/IRA) are subtracted before the deduction.
+    """
+    table = TABLES.get((year, filing_status))
+    if table is None:
+        raise ValueError(f"No tax table for {filing_status!r} in {year}")
+    income = np.asarray(annual_income, dtype=np.float64)
+    taxable = np.maximum(income - pretax_contributions - table.standard_deduction, 0.0)
+    return TaxEstimate(
+        income=income,
+        taxable=taxable,
+        tax=table.tax(taxable),
+        marginal_rate=table.rates[table.bracket(taxable)],
+        standard_deduction=table.standard_deduction,
+        filing_status=filing_status,
+        year=year
+    )
+
+
+def raise_curve(annual_income, raises, filing_status="single", year=LATEST_YEAR):
+    """Extra tax and extra take-home pay for each raise amount, as arrays"""
+    raises = np.asarray(raises, dtype=np.float64)
+    estimate = estimate_tax(annual_income + np.concatenate([[0.0], raises]), filing_status, year)
+    extra_tax = estimate.tax[1:] - estimate.tax[0]
+    return extra_tax, raises - extra_tax
@@ -0,0 +1,281 @@
+"""Serve FinanceChatbot as a local HTTP/1.1 JSON API.
+
+    POST /respond         {"message": ..., "profile": {...}}  ->  {"response": ...}
+    POST /respond_batch   {"requests": [{"message": ..., "profile": {...}}, ...]}  ->  {"responses": [...]}
+    GET  /health          queue depth and limits
+
+Connections are kept alive between requests. Answers are computed on a pool
+of worker processes (threads with --workers 1) so the event loop only parses
+and writes HTTP. Once --max-pending messages are queued or in flight, new
+requests get 429 with Retry-After instead of waiting. SIGINT/SIGTERM stop
+accepting connections, let in-flight requests finish for up to --grace
+seconds, then shut the pool down.
+
+    python server.py --port 8000 --workers 4 --max-pending 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from finbot.service import chunked, clean_profile, init_worker, respond_chunk
+
+
+MAX_BODY = 1 << 20
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_record(record, where=""):
+    """Validate one {message, profile} object, converting numeric profile fields"""
+    if not isinstance(record, dict) or not isinstance(record.get("message"), str):
+        raise HTTPError(400, f'{where}Each request needs a "message" string')
+    try:
+        profile = clean_profile(record.get("profile") or {})
+    except ValueError as e:
+        raise HTTPError(400, f"{where}{e}")
+    return {"message": record["message"], "profile": profile}
+
+
+class ChatServer:
+    """Asyncio HTTP front end over a bounded worker pool"""
+
+    def __init__(self, workers=1, max_pending=256, max_batch=256, chunk_size=16,
+                 keep_alive=15.0, grace=10.0, seed=None):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.chunk_size = chunk_size
+        self.keep_alive = keep_alive
+        self.grace = grace
+        self.seed = seed
+        self.pending = 0
+        self.active = 0
+        self.served = 0
+        self.rejected = 0
+        self.closing = False
+        self.connections = {}
+        self.pool = None
+        self.server = None
+        self.idle = None
+
+    def start_pool(self):
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.seed,))
+        else:
+            # One thread: FinanceChatbot reseeds its rng per answer, so it
+            # must not be shared between threads.
+            self.pool = ThreadPoolExecutor(max_workers=1, initializer=init_worker, initargs=(self.seed,))
+
+    async def answer(self, records):
+        """Responses for records, in order, computed chunk by chunk on the pool"""
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, respond_chunk, chunk)
+            for chunk in chunked(records, self.chunk_size)
+        ))
+        return [response for chunk in chunks for response in chunk]
+
+    async def dispatch(self, method, path, body):
+        """Route one request; returns (status, payload, extra headers)"""
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, {
+                "status": "closing" if self.closing else "ok", "pending": self.pending,
+                "max_pending": self.max_pending, "served": self.served, "rejected": self.rejected
+            }, {}
+        if path not in ("/respond", "/respond_batch"):
+            raise HTTPError(404, f"No route for {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+
+        try:
+            document = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if path == "/respond":
+            records = [parse_record(document)]
+        else:
+            requests = document.get("requests") if isinstance(document, dict) else None
+            if not isinstance(requests, list):
+                raise HTTPError(400, 'Body needs a "requests" list')
+            if len(requests) > self.max_batch:
+                raise HTTPError(413, f"At most {self.max_batch} requests per batch")
+            # A bad record rejects the batch up front, naming it, before any work is queued.
+            records = [parse_record(record, f"requests[{index}]: ") for index, record in enumerate(requests)]
+
+        if self.closing:
+            return 503, {"error": "Server is shutting down"}, {"Retry-After": "1"}
+        if self.pending + len(records) > self.max_pending:
+            self.rejected += 1
+            return 429, {"error": "Too many pending requests"}, {"Retry-After": "1"}
+
+        self.pending += len(records)
+        try:
+            responses = await self.answer(records)
+        finally:
+            self.pending -= len(records)
+        self.served += len(records)
+        if path == "/respond":
+            return 200, {"response": responses[0]}, {}
+        return 200, {"responses": responses}, {}
+
+    async def read_request(self, reader):
+        """(method, path, version, headers, body), or None when the client is done"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.keep_alive)
+        except asyncio.TimeoutError:
+            return None
+        if not line.strip():
+            return None
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Bad Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"Body over {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, version, headers, body
+
+    def write_response(self, writer, status, payload, headers, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def handle_connection(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while not self.closing:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:
+                    self.write_response(writer, e.status, {"error": str(e)}, {}, False)
+                    break
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                self.active += 1
+                try:
+                    try:
+                        status, payload, extra = await self.dispatch(method, path, body)
+                    except HTTPError as e:
+                        status, payload, extra = e.status, {"error": str(e)}, {}
+                    except Exception as e:
+                        status, payload, extra = 500, {"error": f"{type(e).__name__}: {e}"}, {}
+                    keep_alive = keep_alive and not self.closing
+                    self.write_response(writer, status, payload, extra, keep_alive)
+                    await writer.drain()
+                finally:
+                    self.active -= 1
+                    if not self.active and self.closing:
+                        self.idle.set()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host, port):
+        """Serve until SIGINT/SIGTERM, then drain and shut down"""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        self.idle = asyncio.Event()
+        self.start_pool()
+        self.server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        print(f"Finance chatbot listening on http://{host}:{port} with {self.workers} worker(s)", file=sys.stderr)
+        try:
+            await stop.wait()
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self):
+        self.closing = True
+        self.server.close()
+        if self.active:
+            try:
+                await asyncio.wait_for(self.idle.wait(), self.grace)
+            except asyncio.TimeoutError:
+                print(f"Gave up waiting on {self.active} in-flight request(s)", file=sys.stderr)
+        # Idle keep-alive connections are parked in readline(); closing
+        # them ends their handlers.
+        handlers = list(self.connections.values())
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP JSON API for the finance chatbot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count; 1 uses a thread)")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="Messages queued or in flight before answering 429")
+    parser.add_argument("--max-batch", type=int, default=256, help="Largest /respond_batch request")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Messages per worker task")
+    parser.add_argument("--keep-alive", type=float, default=15.0, help="Idle seconds before closing a connection")
+    parser.add_argument("--grace", type=float, default=10.0, help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible tip selection")
+    args = parser.parse_args(argv)
+
+    server = ChatServer(
+        workers=args.workers, max_pending=args.max_pending, max_batch=args.max_batch,
+        chunk_size=args.chunk_size, keep_alive=args.keep_alive, grace=args.grace, seed=args.seed
+    )
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
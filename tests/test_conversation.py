@@ -0,0 +1,97 @@
+import pytest
+
+from finbot.conversation import ConversationState, extract_entities
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("i can put $200 a month toward it", {"amount": 200, "period": "month"}),
+    ("i earn $80k per year", {"amount": 80000, "period": "year"}),
+    ("i make 4,500 dollars monthly", {"amount": 4500, "period": "month"}),
+    ("i have $50,000 saved for retirement", {"amount": 50000}),
+    ("i'm 34 and want to retire at 60", {"age": 34, "retirement_age": 60}),
+    ("i am 28 years old", {"age": 28}),
+    ("what if it earns 7% for 10 years", {"rate": 7, "months": 120}),
+    ("pay it off in 18 months", {"months": 18}),
+])
+def test_extract_entities(text, expected):
+    assert extract_entities(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "i'm 30 thousand in debt",
+    "i'm 30k in debt",
+    "i'm 10 years from retiring",
+    "i'm 25% through my loan",
+])
+def test_amounts_and_durations_are_not_ages(text):
+    assert "age" not in extract_entities(text)
+
+
+@pytest.mark.parametrize("text", [
+    "i have $" + "9" * 400,
+    "i have $500,000,000 saved",
+    "save for 5000 years",
+    "at 250% interest",
+])
+def test_out_of_range_values_are_dropped(text):
+    entities = extract_entities(text)
+    assert "amount" not in entities and "months" not in entities and "rate" not in entities
+
+
+def state_after(*turns):
+    state = ConversationState()
+    for intent, text in turns:
+        state.update(intent, extract_entities(text))
+    return state
+
+
+PROFILE = {"type": "student", "income": 4000, "age": 25, "extra_payment": 0}
+
+
+def test_apply_without_context_returns_profile():
+    assert ConversationState().apply(PROFILE, "debt") is PROFILE
+
+
+def test_apply_monthly_amount_is_extra_payment_for_debt():
+    profile = state_after(("debt", "i can pay $300 a month extra")).apply(PROFILE, "debt")
+    assert profile["extra_payment"] == 300
+
+
+def test_apply_balance_is_not_extra_payment():
+    profile = state_after(("debt", "i have $8,000 of credit card debt")).apply(PROFILE, "debt")
+    assert profile["extra_payment"] == 0
+
+
+def test_apply_yearly_income_for_taxes():
+    profile = state_after(("taxes", "i make $60,000 a year")).apply(PROFILE, "taxes")
+    assert profile["income"] == 5000
+
+
+def test_apply_amount_without_period_leaves_tax_income():
+    profile = state_after(("taxes", "how much tax on $80,000")).apply(PROFILE, "taxes")
+    assert profile["income"] == 4000
+
+
+def test_apply_retirement_balance_and_contribution():
+    state = state_after(("retirement", "i have $50,000 saved for retirement"))
+    profile = state.apply(PROFILE, "retirement")
+    assert profile["retirement_savings"] == 50000
+    assert "contribution_rate" not in profile
+
+    state = state_after(("retirement", "i put $400 a month into my 401k"))
+    profile = state.apply(PROFILE, "retirement")
+    assert profile["contribution_rate"] == 10
+    assert "retirement_savings" not in profile
+
+
+def test_apply_stated_age_until_profile_age_changes():
+    state = state_after(("retirement", "i'm 40 and want to retire at 62"))
+    profile = state.apply(PROFILE, "retirement")
+    assert (profile["age"], profile["retirement_age"]) == (40, 62)
+    assert state.apply(PROFILE, "retirement")["age"] == 40
+    assert state.apply(dict(PROFILE, age=50), "retirement")["age"] == 50
+
+
+def test_topic_switch_drops_topic_values():
+    state = state_after(("debt", "i can pay $300 a month"), ("taxes", "what about taxes"))
+    assert state.apply(PROFILE, "taxes")["income"] == 4000
@@ -0,0 +1,34 @@
+from finbot.history import ChatHistory
+
+
+def make_history(tmp_path, turns):
+    history = ChatHistory(str(tmp_path / "chat.sqlite3"), window=5, page_size=3, max_pages=2)
+    for index in range(turns):
+        history.append("user", str(index))
+    return history
+
+
+def contents(history):
+    return [message["content"] for message in history.visible()]
+
+
+def test_spilled_turns_page_back_in_order(tmp_path):
+    history = make_history(tmp_path, 10)
+    assert contents(history) == ["5", "6", "7", "8", "9"]
+    history.load_earlier()
+    assert contents(history) == [str(index) for index in range(2, 10)]
+    history.collapse()
+    assert contents(history) == ["5", "6", "7", "8", "9"]
+
+
+def test_loaded_pages_are_capped(tmp_path):
+    history = make_history(tmp_path, 30)
+    while history.has_earlier():
+        history.load_earlier()
+    assert len(history.earlier) == 6
+
+    for index in range(30, 40):
+        history.append("user", str(index))
+    visible = contents(history)
+    assert len(history.earlier) <= 6
+    assert visible == [str(index) for index in range(int(visible[0]), 40)]
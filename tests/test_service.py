@@ -0,0 +1,34 @@
+import re
+
+import pytest
+
+from finbot.service import chunked, clean_profile
+
+
+def test_clean_profile_converts_numeric_strings():
+    profile = clean_profile({"income": "4500", "age": 30.0, "debts": [{"name": "Card", "balance": "1200.50"}]})
+    assert profile == {"income": 4500, "age": 30, "debts": [{"name": "Card", "balance": 1200.5}]}
+
+
+def test_clean_profile_drops_client_context():
+    assert clean_profile({"context": {"amount": "abc"}}) == {}
+
+
+@pytest.mark.parametrize("profile, field", [
+    ({"income": "abc"}, '"income"'),
+    ({"income": True}, '"income"'),
+    ({"age": 300}, '"age"'),
+    ({"income": float("inf")}, '"income"'),
+    ({"debts": [{"balance": 100}, {"balance": "x"}]}, '"debts[1].balance"'),
+    ({"debts": {"balance": 100}}, '"debts"'),
+    ({"goals": "retire"}, '"goals"'),
+    ({"filing_status": "bogus"}, '"filing_status"'),
+    ({"spending": {"needs": 1}}, '"spending.'),
+])
+def test_clean_profile_rejects_bad_fields(profile, field):
+    with pytest.raises(ValueError, match=re.escape(field)):
+        clean_profile(profile)
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
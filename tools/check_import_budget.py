@@ -0,0 +1,79 @@
+"""Fail if the advice engine gets slow or heavy to start.
+
+Imports the engine in a fresh interpreter under -X importtime, builds a
+FinanceChatbot and answers one rule-based question, then checks the import
+time, the peak resident memory and that no UI or numerical library was
+loaded along the way. The median of several runs is compared against the
+budget, so one noisy run doesn't fail the check. Exits non-zero with the
+offending numbers when a budget is exceeded.
+
+    python tools/check_import_budget.py [--max-import-ms 100] [--max-rss-mb 64]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("streamlit", "numpy", "pandas", "plotly", "httpx", "asyncio")
+
+PROBE = """
+import json, resource, sys
+from finbot import FinanceChatbot
+FinanceChatbot(seed=0, cache=False).get_response("how can I save money each month", {"type": "student", "age": 20})
+print(json.dumps({
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": sorted(name for name in sys.modules if name.split(".")[0] in %r)
+}))
+"""
+IMPORT_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$")
+
+
+def probe():
+    """Run one cold start; returns (import ms, peak RSS MB, heavy modules loaded)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE % (HEAVY_MODULES,)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        # The unindented "finbot" entry covers everything it imported.
+        if match and match.group(2) == "finbot":
+            cumulative = int(match.group(1))
+    report = json.loads(result.stdout.splitlines()[-1])
+    return cumulative / 1000, report["rss_kb"] / 1024, report["loaded"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-import-ms", type=float, default=100.0)
+    parser.add_argument("--max-rss-mb", type=float, default=64.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    import_ms = statistics.median(run[0] for run in runs)
+    rss_mb = statistics.median(run[1] for run in runs)
+    loaded = sorted({name for run in runs for name in run[2]})
+
+    print(f"import finbot: {import_ms:.1f} ms (budget {args.max_import_ms:.0f} ms)")
+    print(f"peak RSS after one answer: {rss_mb:.1f} MB (budget {args.max_rss_mb:.0f} MB)")
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.1f} ms")
+    if rss_mb > args.max_rss_mb:
+        failures.append(f"peak RSS was {rss_mb:.1f} MB")
+    if loaded:
+        failures.append(f"heavy modules loaded: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
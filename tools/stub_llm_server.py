@@ -0,0 +1,95 @@
+"""Local stand-in for the chat-completions endpoint used by llm.py.
+
+Streams OpenAI-style server-sent events with configurable latency and
+failure rates, so the generation backend can be exercised offline:
+
+    python tools/stub_llm_server.py --port 8808 --latency 0.5 --error-rate 0.2
+    LLM_ENABLED=1 HF_API_KEY=stub HF_API_URL=http://127.0.0.1:8808/v1/chat/completions streamlit run main.py
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        sys.stderr.write("stub: " + format % args + "\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        options = self.server.options
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            roll = self.server.rng.random()
+
+        if roll < options.error_rate:
+            payload = b'{"error": "simulated failure"}'
+            self.send_response(500)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        time.sleep(options.latency)
+        if roll < options.error_rate + options.stall_rate:
+            time.sleep(options.stall)
+
+        try:
+            prompt = json.loads(body)["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError):
+            prompt = ""
+        reference = prompt.split("Reference advice:")[-1].split("Question:")[0].strip()
+        words = ("Here's my take: " + (reference or "keep saving consistently.")).split(" ")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, word in enumerate(words):
+            token = word if index == 0 else " " + word
+            event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            time.sleep(options.token_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub streaming chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests that stall before streaming")
+    parser.add_argument("--stall", type=float, default=30.0, help="Seconds a stalled request waits")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((options.host, options.port), StubHandler)
+    server.options = options
+    server.rng = random.Random(options.seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    print(f"Stub LLM listening on http://{options.host}:{options.port}/v1/chat/completions", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()